@@ -1,10 +1,19 @@
+import asyncio
+import bisect
 import json
+import os
+import re
+import sys
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import threading
 import time
+import uuid
 import customtkinter as ctk
 
+import tegbar_chat
+from tegbar_async import AsyncBridge
+from tegbar_profile import record, span, timed
 
 import tkinter.messagebox as msg
 
@@ -12,11 +21,1224 @@ ctk.set_appearance_mode("system")
 ctk.set_default_color_theme("blue")
 
 
+class Task:
+    """One task of the in-memory store.
+
+    __slots__ records instead of dicts: no per-task hash table, priority is
+    always one of the shared PRIORITIES strings and created is an integer
+    (microseconds since 1970-01-01, local time) instead of an ISO string.
+    The JSON files keep the dict layout; from_dict / to_dict convert.
+    """
+    __slots__ = ("id", "text", "time", "priority", "done", "notes", "created")
+    PRIORITIES = ("Low", "Normal", "High")
+    _PRIORITY = {p: p for p in PRIORITIES}
+    EPOCH = datetime(1970, 1, 1)
+    MICROSECOND = timedelta(microseconds=1)
+
+    def __init__(self, id, text, time="", priority="Normal", done=False, notes="", created=None):
+        self.id = id
+        self.text = text
+        self.time = sys.intern(time)
+        self.priority = self._PRIORITY.get(priority) or sys.intern(str(priority))
+        self.done = bool(done)
+        self.notes = notes
+        self.created = self.stamp(created)
+
+    @classmethod
+    def stamp(cls, created=None):
+        """created as stored: int as is, ISO string parsed, None means now"""
+        if isinstance(created, int):
+            return created
+        try:
+            dt = datetime.fromisoformat(created) if created else datetime.now()
+        except (TypeError, ValueError):
+            dt = datetime.now()
+        if dt.tzinfo is not None:
+            dt = dt.replace(tzinfo=None)  # keep the wall-clock time
+        return (dt - cls.EPOCH) // cls.MICROSECOND
+
+    @classmethod
+    def from_dict(cls, d, task_id=None):
+        return cls(task_id or d.get("id"), d.get("text", ""), d.get("time") or "", d.get("priority", "Normal"),
+                   d.get("done", False), d.get("notes", ""), d.get("created"))
+
+    def created_iso(self):
+        return (self.EPOCH + timedelta(microseconds=self.created)).isoformat()
+
+    def to_dict(self):
+        return {"id": self.id, "text": self.text, "time": self.time, "priority": self.priority,
+                "done": self.done, "notes": self.notes, "created": self.created_iso()}
+
+    def update(self, fields):
+        for name, value in fields.items():
+            if name == "priority":
+                value = self._PRIORITY.get(value) or sys.intern(str(value))
+            elif name == "created":
+                value = self.stamp(value)
+            setattr(self, name, value)
+
+
+class TaskJournal:
+    """Write-ahead log of task mutations on top of a JSON snapshot.
+
+    Every mutation appends one JSON line to the log; the log is folded into
+    the snapshot by compact(). Records carry a sequence number and the
+    snapshot remembers the last one it contains, so a crash between writing
+    the snapshot and truncating the log never replays a record twice.
+    """
+    COMPACT_EVERY = 500  # log records before the snapshot is rewritten
+    SEQ_KEY = "_seq"
+
+    def __init__(self, snapshot_path, log_path):
+        self.snapshot_path = snapshot_path
+        self.log_path = log_path
+        self.seq = 0
+        self.pending = 0  # records not yet folded into the snapshot
+        self.skipped = 0  # log records the last read() couldn't apply
+        self._buffer = []  # encoded records not yet written to the log
+        self._log = None
+        self._lock = threading.Lock()  # guards seq and the buffer
+        self._io_lock = threading.Lock()  # serializes file writes
+
+    def read(self):
+        """Return (data, last_seq, replayed) from the snapshot with the log replayed.
+
+        Records that no longer match the data (an id or date that isn't
+        there) are skipped and counted in self.skipped rather than failing
+        the whole replay.
+        """
+        data = {}
+        if self.snapshot_path.exists():
+            data = json.loads(self.snapshot_path.read_text(encoding="utf-8"))
+        seq = data.pop(self.SEQ_KEY, 0)
+        replayed = skipped = 0
+        if self.log_path.exists():
+            with self.log_path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # torn write at the end of the log
+                    if record.get("seq", 0) <= seq:
+                        continue  # already part of the snapshot
+                    if self.apply(data, record):
+                        replayed += 1
+                    else:
+                        skipped += 1
+                    seq = record["seq"]
+        self.skipped = skipped
+        return data, seq, replayed
+
+    def load(self):
+        data, self.seq, self.pending = self.read()
+        return data
+
+    def renumber_after_failed_load(self):
+        """Number new records past anything the files on disk may hold.
+
+        After a failed read the snapshot's seq is unknown, and records
+        numbered from 0 would be skipped as "already in the snapshot" once it
+        reads again. Milliseconds since the epoch are above any count of
+        edits, and above the seqs of earlier sessions that did the same.
+        """
+        highest = 0
+        try:
+            with self.log_path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        highest = max(highest, int(json.loads(line).get("seq", 0)))
+                    except (ValueError, TypeError, AttributeError):
+                        continue
+        except OSError:
+            pass
+        with self._lock:
+            self.seq = max(self.seq, highest, int(time.time() * 1000))
+
+    @staticmethod
+    def position(tasks, record):
+        """Index of the record's task in tasks, or None if it isn't there"""
+        if "id" not in record:
+            index = record.get("index")  # logs written before tasks had ids
+            return index if isinstance(index, int) and 0 <= index < len(tasks) else None
+        return next((i for i, t in enumerate(tasks) if t.get("id") == record["id"]), None)
+
+    @classmethod
+    def apply(cls, data, record):
+        """Apply one record to data; False if it refers to a task that isn't there."""
+        op = record["op"]
+        date_key = record.get("date")
+        if op == "add":
+            data.setdefault(date_key, []).append(record["task"])
+        elif op == "add_many":
+            for date_key, task in record["tasks"]:
+                data.setdefault(date_key, []).append(task)
+        elif op in ("update", "delete"):
+            tasks = data.get(date_key, [])
+            index = cls.position(tasks, record)
+            if index is None:
+                return False
+            if op == "update":
+                tasks[index].update(record["fields"])
+            else:
+                del tasks[index]
+                if not tasks:
+                    del data[date_key]
+        elif op == "clear_done":
+            for key in list(data.keys()):
+                data[key] = [t for t in data[key] if not t.get("done")]
+                if not data[key]:
+                    del data[key]
+        return True
+
+    def append(self, op, date_key=None, **fields):
+        """Queue one record; it reaches the disk on the next write_pending()."""
+        with self._lock:
+            self.seq += 1
+            record = {"seq": self.seq, "op": op, "date": date_key, **fields}
+            # encode now so later edits to the same task can't leak into this record
+            self._buffer.append(json.dumps(record, ensure_ascii=False, default=Task.to_dict) + "\n")
+            self.pending += 1
+
+    @timed()
+    def write_pending(self):
+        with self._io_lock:
+            with self._lock:
+                lines, self._buffer = self._buffer, []
+            if not lines:
+                return 0
+            if self._log is None:
+                self._log = self.log_path.open("a", encoding="utf-8")
+            self._log.write("".join(lines))
+            self._log.flush()
+            return len(lines)
+
+    @timed()
+    def compact(self, tasks_by_date=None):
+        """Rewrite the snapshot and reset the log.
+
+        Without tasks_by_date the snapshot is rebuilt from the files themselves,
+        which is safe while the UI keeps mutating its own copy; pass the
+        in-memory state only when nothing else can touch it.
+        """
+        with self._io_lock:
+            if tasks_by_date is None:
+                data, seq, _ = self.read()
+            else:
+                with self._lock:
+                    data, seq = dict(tasks_by_date), self.seq
+                    self._buffer = []
+            data[self.SEQ_KEY] = seq
+            tmp = self.snapshot_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False, default=Task.to_dict), encoding="utf-8")
+            os.replace(tmp, self.snapshot_path)
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+            self.log_path.write_text("", encoding="utf-8")
+            with self._lock:
+                self.pending = len(self._buffer)
+
+    def close(self):
+        with self._io_lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+
+
+class SaveScheduler:
+    """Coalesces save requests and runs them on one background thread.
+
+    Jobs are keyed by name: scheduling a name that is already pending replaces
+    it, so a burst of clicks within DELAY seconds costs a single write.
+    """
+    DELAY = 0.3
+
+    def __init__(self, delay=DELAY, on_error=None):
+        self.delay = delay
+        self.on_error = on_error  # called from the worker thread with (name, exc)
+        self.requested = 0
+        self.performed = 0
+        self.last_latency = 0.0  # seconds spent in the last write
+        self._jobs = {}
+        self._due = None
+        self._busy = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def schedule(self, name, job):
+        with self._cond:
+            self.requested += 1
+            self._jobs[name] = job
+            if self._due is None:
+                self._due = time.monotonic() + self.delay
+            self._cond.notify_all()
+
+    def flush(self):
+        """Run whatever is pending now and wait for it to finish."""
+        with self._cond:
+            if self._jobs:
+                self._due = time.monotonic()
+                self._cond.notify_all()
+            self._cond.wait_for(lambda: not self._jobs and not self._busy)
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def stats(self):
+        return {"requested": self.requested, "performed": self.performed,
+                "last_latency_ms": round(self.last_latency * 1000, 2)}
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (self._due is None or time.monotonic() < self._due):
+                    self._cond.wait(None if self._due is None else self._due - time.monotonic())
+                if self._closed:
+                    return
+                jobs, self._jobs, self._due = self._jobs, {}, None
+                self._busy = True
+            for name, job in jobs.items():
+                start = time.perf_counter()
+                try:
+                    job()
+                except Exception as e:
+                    if self.on_error:
+                        self.on_error(name, e)
+                self.last_latency = time.perf_counter() - start
+                self.performed += 1
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+
+def write_json_atomic(path, data):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class ChatStore:
+    """Team chat history as append-only segments per contact plus a manifest.
+
+    Each contact has a directory of numbered JSON-lines segments holding at
+    most SEGMENT_SIZE messages. The manifest lists the contacts with their
+    directory and segment count and is only rewritten when a contact or a
+    segment is added, so storing a message is one appended line. Appends are
+    queued by append() and written by write_pending() on the save worker.
+    """
+    SEGMENT_SIZE = 500
+    MANIFEST = "manifest.json"
+
+    def __init__(self, root, legacy_path=None):
+        self.root = root
+        self.legacy_path = legacy_path  # single-file store migrated on first open()
+        self.manifest = {"contacts": {}}  # name -> {"dir": ..., "segments": n}
+        self.older = {}  # name -> index of the next segment load_older() reads
+        self.tail_sizes = {}  # name -> messages in the contact's last segment
+        self._buffer = []  # (name, encoded message) not yet written
+        self._lock = threading.Lock()  # guards the manifest and the buffer
+        self._io_lock = threading.Lock()  # serializes file writes
+
+    def open(self):
+        """Read the manifest (migrating the old store if needed); returns the contact names."""
+        path = self.root / self.MANIFEST
+        if path.exists():
+            self.manifest = json.loads(path.read_text(encoding="utf-8"))
+        else:
+            data = {}
+            if self.legacy_path is not None and self.legacy_path.exists():
+                data = json.loads(self.legacy_path.read_text(encoding="utf-8"))
+            else:
+                # seed example contacts
+                data = {
+                    "Jonas": [{"sender":"Jonas","text":"Hello team!","time":"09:12"}],
+                    "Neo": [], "Abraham": [], "Jessica": []
+                }
+            self.migrate({k: v if isinstance(v, list) else [] for k, v in data.items()})
+        return list(self.manifest["contacts"])
+
+    def migrate(self, conversations):
+        # segments first and the manifest last: an interrupted migration reruns from scratch
+        self.root.mkdir(parents=True, exist_ok=True)
+        contacts = {}
+        for number, (name, messages) in enumerate(conversations.items()):
+            entry = contacts[name] = {"dir": f"{number:04d}", "segments": 0}
+            (self.root / entry["dir"]).mkdir(exist_ok=True)
+            for start in range(0, len(messages), self.SEGMENT_SIZE):
+                lines = [json.dumps(m, ensure_ascii=False) + "\n" for m in messages[start:start + self.SEGMENT_SIZE]]
+                self.segment_path(entry, entry["segments"]).write_text("".join(lines), encoding="utf-8")
+                entry["segments"] += 1
+        self.manifest = {"contacts": contacts}
+        write_json_atomic(self.root / self.MANIFEST, self.manifest)
+        if self.legacy_path is not None and self.legacy_path.exists():
+            os.replace(self.legacy_path, self.legacy_path.with_name(self.legacy_path.name + ".migrated"))
+
+    def segment_path(self, entry, index):
+        return self.root / entry["dir"] / f"{index:06d}.jsonl"
+
+    def read_segment(self, name, index):
+        with self._lock:
+            entry = self.manifest["contacts"].get(name)
+        if entry is None or index < 0:
+            return []
+        messages = []
+        try:
+            with self.segment_path(entry, index).open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        messages.append(json.loads(line))
+                    except ValueError:
+                        break  # torn write at the end of the segment
+        except FileNotFoundError:
+            pass
+        return messages
+
+    @timed()
+    def load_newest(self, name, at_least=1):
+        """The newest segments of a conversation, read newest first until at
+        least at_least messages are found. Older ones come from load_older()."""
+        with self._lock:
+            entry = self.manifest["contacts"].get(name)
+            index = entry["segments"] - 1 if entry else -1
+        messages = []
+        while index >= 0 and len(messages) < at_least:
+            messages[:0] = self.read_segment(name, index)
+            index -= 1
+        self.older[name] = index
+        return messages
+
+    @timed()
+    def load_older(self, name):
+        """The segment before the ones already loaded ([] once there is none)"""
+        index = self.older.get(name, -1)
+        if index < 0:
+            return []
+        self.older[name] = index - 1
+        return self.read_segment(name, index)
+
+    def append(self, name, message):
+        """Queue one message; it reaches the disk on the next write_pending()."""
+        with self._lock:
+            self._buffer.append((name, json.dumps(message, ensure_ascii=False) + "\n"))
+
+    @timed()
+    def write_pending(self):
+        with self._io_lock:
+            with self._lock:
+                pending, self._buffer = self._buffer, []
+            if not pending:
+                return 0
+            by_file = {}  # path -> lines, in order
+            manifest_changed = False
+            for name, line in pending:
+                with self._lock:
+                    contacts = self.manifest["contacts"]
+                    entry = contacts.get(name)
+                    if entry is None:
+                        entry = contacts[name] = {"dir": f"{len(contacts):04d}", "segments": 0}
+                        manifest_changed = True
+                if name not in self.tail_sizes:
+                    self.tail_sizes[name] = self.count_tail(entry)
+                if entry["segments"] == 0 or self.tail_sizes[name] >= self.SEGMENT_SIZE:
+                    with self._lock:
+                        entry["segments"] += 1
+                    self.tail_sizes[name] = 0
+                    manifest_changed = True
+                by_file.setdefault(self.segment_path(entry, entry["segments"] - 1), []).append(line)
+                self.tail_sizes[name] += 1
+            for path, lines in by_file.items():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                with path.open("a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+            if manifest_changed:
+                # after the segments, so the manifest never names a segment that isn't there
+                with self._lock:
+                    manifest = json.loads(json.dumps(self.manifest))
+                write_json_atomic(self.root / self.MANIFEST, manifest)
+            return len(pending)
+
+    def count_tail(self, entry):
+        if entry["segments"] == 0:
+            return 0
+        try:
+            with self.segment_path(entry, entry["segments"] - 1).open(encoding="utf-8") as f:
+                return sum(1 for _ in f)
+        except FileNotFoundError:
+            return 0
+
+
+class TaskSearchIndex:
+    """Inverted index over task titles and notes, across every date.
+
+    Each query word matches indexed words it is a prefix of; a task must match
+    every query word. Results are ranked by where the words were found (title
+    beats notes, whole words beat prefixes) and then by recency. All methods
+    may be called from any thread.
+    """
+    TEXT_WEIGHT = 2
+    NOTES_WEIGHT = 1
+    WORD = re.compile(r"\w+")
+
+    def __init__(self):
+        self.postings = {}  # word -> {task_id: weight}
+        self.words = []  # sorted vocabulary, for prefix ranges
+        self.docs = {}  # task_id -> (words it was indexed under, created)
+        self.lock = threading.RLock()
+
+    @classmethod
+    def tokenize(cls, text):
+        return cls.WORD.findall(text.lower())
+
+    def add(self, task):
+        with self.lock:
+            self._add(task)
+
+    def add_many(self, tasks):
+        # new words are sorted into the vocabulary once at the end, not one by one
+        with self.lock:
+            new_words = []
+            for task in tasks:
+                self._add(task, new_words)
+            if new_words:
+                self.words.extend(new_words)
+                self.words.sort()
+
+    def _add(self, task, new_words=None):
+        weights = {}
+        for word in self.tokenize(task.notes):
+            weights[word] = self.NOTES_WEIGHT
+        for word in self.tokenize(task.text):
+            weights[word] = self.TEXT_WEIGHT
+        for word, weight in weights.items():
+            posting = self.postings.get(word)
+            if posting is None:
+                posting = self.postings[word] = {}
+                if new_words is None:
+                    bisect.insort(self.words, word)
+                else:
+                    new_words.append(word)
+            posting[task.id] = weight
+        self.docs[task.id] = (tuple(weights), task.created)
+
+    def remove(self, task_id):
+        with self.lock:
+            self._remove(task_id)
+
+    def _remove(self, task_id):
+        words, _ = self.docs.pop(task_id, ((), 0))
+        for word in words:
+            posting = self.postings[word]
+            del posting[task_id]
+            if not posting:
+                del self.postings[word]
+                del self.words[bisect.bisect_left(self.words, word)]
+
+    def update(self, task):
+        with self.lock:
+            self._remove(task.id)
+            self._add(task)
+
+    def clear(self):
+        with self.lock:
+            self.postings.clear()
+            self.words.clear()
+            self.docs.clear()
+
+    def matches(self, term, cancelled=None):
+        """{task_id: score} for every task with a word starting with term."""
+        scores = {}
+        i = bisect.bisect_left(self.words, term)
+        while i < len(self.words) and self.words[i].startswith(term):
+            if cancelled and i % 256 == 0 and cancelled():
+                return None
+            word = self.words[i]
+            bonus = 2 if word == term else 1
+            for task_id, weight in self.postings[word].items():
+                score = weight * bonus
+                if score > scores.get(task_id, 0):
+                    scores[task_id] = score
+            i += 1
+        return scores
+
+    @timed()
+    def search(self, query, limit=None, cancelled=None):
+        """Task ids matching every word of query, best first.
+
+        cancelled is polled while scanning; when it returns True the search is
+        abandoned and None is returned.
+        """
+        terms = self.tokenize(query)
+        if not terms:
+            return []
+        with self.lock:
+            per_term = []
+            for term in set(terms):
+                found = self.matches(term, cancelled)
+                if found is None:
+                    return None
+                per_term.append(found)
+            # intersect starting from the rarest term
+            per_term.sort(key=len)
+            scores = dict(per_term[0])
+            for other in per_term[1:]:
+                scores = {tid: sc + other[tid] for tid, sc in scores.items() if tid in other}
+                if not scores:
+                    return []
+            if cancelled and cancelled():
+                return None
+            ranked = sorted(scores, key=lambda tid: (scores[tid], self.docs[tid][1]), reverse=True)
+        return ranked[:limit] if limit else ranked
+
+
+class TaskSummary:
+    """Done / undone counts per day and overall, plus the days in date order.
+
+    Kept up to date by every task mutation, so the History page reads its
+    numbers in O(1) and walks only the days it actually shows. version
+    changes on every mutation, letting views skip redraws when nothing did.
+    All methods may be called from any thread.
+    """
+    def __init__(self):
+        self.days = {}  # date_key -> [done, undone]
+        self.dates = []  # sorted date keys with at least one task
+        self.done = 0
+        self.undone = 0
+        self.version = 0
+        self.changed = set()  # days touched since take_changed()
+        self.changed_all = True
+        self.lock = threading.RLock()
+
+    @property
+    def total(self):
+        return self.done + self.undone
+
+    def add(self, date_key, done):
+        with self.lock:
+            counts = self.days.get(date_key)
+            if counts is None:
+                counts = self.days[date_key] = [0, 0]
+                bisect.insort(self.dates, date_key)
+            self._count(date_key, counts, done, 1)
+
+    def remove(self, date_key, done):
+        with self.lock:
+            self._count(date_key, self.days[date_key], done, -1)
+
+    def set_done(self, date_key, done):
+        """A task of date_key flipped to done (or back)"""
+        with self.lock:
+            counts = self.days[date_key]
+            # count the new state first so the day never looks empty
+            self._count(date_key, counts, done, 1)
+            self._count(date_key, counts, not done, -1)
+
+    def clear_done(self):
+        with self.lock:
+            for date_key, counts in list(self.days.items()):
+                self._count(date_key, counts, True, -counts[0])
+
+    def touch(self, date_key):
+        """A task of date_key changed without affecting the counts"""
+        with self.lock:
+            self.version += 1
+            self.changed.add(date_key)
+
+    def clear(self):
+        with self.lock:
+            self.days.clear()
+            self.dates.clear()
+            self.done = self.undone = 0
+            self.version += 1
+            self.changed_all = True
+
+    def take_changed(self):
+        """(everything changed, days changed) since the last call"""
+        with self.lock:
+            result = (self.changed_all, self.changed)
+            self.changed_all, self.changed = False, set()
+            return result
+
+    def _count(self, date_key, counts, done, delta):
+        if done:
+            counts[0] += delta
+            self.done += delta
+        else:
+            counts[1] += delta
+            self.undone += delta
+        self.version += 1
+        self.changed.add(date_key)
+        if counts == [0, 0]:
+            del self.days[date_key]
+            del self.dates[bisect.bisect_left(self.dates, date_key)]
+
+    def recent_dates(self, limit):
+        """The newest date keys, newest first, holding at least limit tasks"""
+        with self.lock:
+            dates, count = [], 0
+            for date_key in reversed(self.dates):
+                if count >= limit:
+                    break
+                dates.append(date_key)
+                count += sum(self.days[date_key])
+            return dates
+
+
+class TaskAnalytics:
+    """Completion statistics over the whole history.
+
+    Each day is reduced to a bucket of done/total counts per priority. The
+    buckets are cached and only the days TaskSummary reports as changed are
+    recounted; the buckets are then copied into per-day lists in date order
+    and every statistic is a single pass over those lists, so years of
+    history cost one step per day with tasks rather than per task.
+    """
+    PERIODS = ("day", "week", "month")
+
+    def __init__(self, summary):
+        self.summary = summary
+        self.buckets = {}  # date_key -> (ordinal, done per priority, total per priority)
+        self.columns = None  # built from buckets on demand
+        self.cache = {}  # memoized results, dropped whenever a bucket changes
+        self.last_ms = 0.0  # time spent in the last refresh()
+
+    @timed()
+    def refresh(self, tasks_by_date):
+        """Recount the days changed since the last call; call before reading."""
+        start = time.perf_counter()
+        everything, days = self.summary.take_changed()
+        if everything:
+            self.buckets.clear()
+            days = tasks_by_date.keys()
+        for date_key in days:
+            tasks = tasks_by_date.get(date_key)
+            if tasks:
+                try:
+                    ordinal = date.fromisoformat(date_key).toordinal()
+                except ValueError:
+                    continue
+                self.buckets[date_key] = (ordinal,) + self.count(tasks)
+            else:
+                self.buckets.pop(date_key, None)
+        if everything or days:
+            self.columns = None
+            self.cache.clear()
+        self.last_ms = (time.perf_counter() - start) * 1000
+
+    def count(self, tasks):
+        done = [0] * len(Task.PRIORITIES)
+        total = [0] * len(Task.PRIORITIES)
+        for task in tasks:
+            try:
+                p = Task.PRIORITIES.index(task.priority)
+            except ValueError:
+                p = 1  # unknown priorities count as Normal
+            total[p] += 1
+            if task.done:
+                done[p] += 1
+        return tuple(done), tuple(total)
+
+    def get_columns(self):
+        """{"day": ordinals, "done": ..., "total": ..., ("done", p): ..., ("total", p): ...}"""
+        if self.columns is None:
+            columns = {"day": [], "done": [], "total": []}
+            for p in Task.PRIORITIES:
+                columns["done", p] = []
+                columns["total", p] = []
+            for ordinal, done, total in sorted(self.buckets.values()):
+                columns["day"].append(ordinal)
+                columns["done"].append(sum(done))
+                columns["total"].append(sum(total))
+                for i, p in enumerate(Task.PRIORITIES):
+                    columns["done", p].append(done[i])
+                    columns["total", p].append(total[i])
+            self.columns = columns
+        return self.columns
+
+    @staticmethod
+    def period_start(ordinal, period):
+        if period == "day":
+            return ordinal
+        d = date.fromordinal(ordinal)
+        if period == "week":
+            return ordinal - d.weekday()  # Monday
+        return d.replace(day=1).toordinal()
+
+    def rates(self, period):
+        """[(first day of period, done, total)] in date order, for days with tasks"""
+        key = ("rates", period)
+        if key not in self.cache:
+            columns = self.get_columns()
+            result = []
+            for ordinal, done, total in zip(columns["day"], columns["done"], columns["total"]):
+                start = self.period_start(ordinal, period)
+                if result and result[-1][0] == start:
+                    result[-1][1] += done
+                    result[-1][2] += total
+                else:
+                    result.append([start, done, total])
+            self.cache[key] = [tuple(r) for r in result]
+        return self.cache[key]
+
+    def by_priority(self):
+        """{priority: (done, total)} over all days"""
+        if "priority" not in self.cache:
+            columns = self.get_columns()
+            self.cache["priority"] = {p: (sum(columns["done", p]), sum(columns["total", p]))
+                                      for p in Task.PRIORITIES}
+        return self.cache["priority"]
+
+    def streaks(self, today=None):
+        """(current, longest) runs of consecutive days with every task done.
+
+        A day without tasks ends a run; the current run may end yesterday
+        while today still has open tasks.
+        """
+        today = (today or date.today()).toordinal()
+        if "streaks" not in self.cache:
+            columns = self.get_columns()
+            longest = run = 0
+            previous = None
+            runs_end = {}  # last day of a run -> its length
+            for ordinal, done, total in zip(columns["day"], columns["done"], columns["total"]):
+                if done < total:
+                    run = 0
+                elif run and ordinal == previous + 1:
+                    run += 1
+                else:
+                    run = 1
+                previous = ordinal
+                if run:
+                    runs_end[ordinal] = run
+                    longest = max(longest, run)
+            self.cache["streaks"] = (runs_end, longest)
+        runs_end, longest = self.cache["streaks"]
+        current = runs_end.get(today) or runs_end.get(today - 1, 0)
+        return current, longest
+
+
+class SearchPipeline:
+    """Debounced search that runs off the UI thread and drops stale results.
+
+    submit() (re)starts a short timer; when it fires the query goes to the
+    worker pool. Each query gets a generation number, and a newer submit()
+    or cancel() makes every older query abandon its scan and discard its
+    result, so only the newest result set ever reaches apply().
+    """
+    DEBOUNCE_MS = 150
+
+    def __init__(self, widget, workers, run, apply, delay_ms=DEBOUNCE_MS):
+        self.widget = widget  # any Tk widget, used for after()
+        self.workers = workers  # WorkerPool the scans run on
+        self.run = run  # run(args, cancelled) -> result; called on a worker
+        self.apply = apply  # apply(result); called on the UI thread
+        self.delay_ms = delay_ms
+        self.generation = 0
+        self.last_latency = None  # ms from the last keystroke to applied results
+        self._keystroke = None
+        self._timer = None
+
+    def submit(self, *args, debounce=True):
+        self.cancel()
+        self._keystroke = time.perf_counter()
+        if debounce:
+            self._timer = self.widget.after(self.delay_ms, lambda: self._start(args))
+        else:
+            self._start(args)
+
+    def cancel(self):
+        if self._timer is not None:
+            self.widget.after_cancel(self._timer)
+            self._timer = None
+        self.generation += 1  # read by running scans, written only here
+
+    def _start(self, args):
+        self._timer = None
+        generation = self.generation
+        if not self.workers.submit(self._scan, generation, args,
+                                   on_done=lambda result: self._deliver(generation, result)):
+            # pool saturated: try again shortly rather than lose the query
+            self._timer = self.widget.after(self.delay_ms, lambda: self._start(args))
+
+    def _scan(self, generation, args):
+        # on a worker; an older generation gives up as soon as it notices
+        return self.run(args, lambda: generation != self.generation)
+
+    def _deliver(self, generation, result):
+        if result is None or generation != self.generation:
+            return
+        self.apply(result)
+        self.last_latency = (time.perf_counter() - self._keystroke) * 1000
+
+
+class WorkerPool:
+    """Bounded admission to the bridge's worker threads.
+
+    submit() hands fn(*args) to AsyncBridge.submit, which brings the result
+    to on_done (or the exception to on_error) on the Tk thread through the
+    asyncio loop. When MAX_QUEUED jobs are already waiting it returns False
+    instead of queueing, so the number of pending jobs stays fixed under load.
+    """
+    MAX_QUEUED = 64
+
+    def __init__(self, bridge, max_queued=MAX_QUEUED):
+        self.bridge = bridge
+        self.workers = bridge.WORKERS
+        self.max_queued = max_queued
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()  # guards the counters
+
+    def submit(self, fn, *args, on_done=None, on_error=None):
+        if not self._admit():
+            return False
+        self.bridge.submit(self._job, fn, args, on_done=on_done, on_error=on_error)
+        return True
+
+    async def run(self, fn, *args):
+        """Await fn(*args) on a worker from a coroutine on the Tk thread's loop"""
+        if not self._admit():
+            raise RuntimeError("Too much background work queued")
+        return await self.bridge.run_in_thread(self._job, fn, args)
+
+    def _admit(self):
+        with self._lock:
+            if self.queued >= self.max_queued:
+                self.rejected += 1
+                return False
+            self.queued += 1
+            return True
+
+    def _job(self, fn, args):
+        with self._lock:
+            self.queued -= 1
+            self.active += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+
+    def stats(self):
+        return {"workers": self.workers, "queued": self.queued, "active": self.active,
+                "completed": self.completed, "rejected": self.rejected}
+
+
+def new_task_id():
+    return uuid.uuid4().hex
+
+
+PRIORITY_COLORS = {"High": "#ff6363", "Normal": "#1f6feb", "Low": "#8ea28e"}
+
+
+class TaskRow(ctk.CTkFrame):
+    """One recyclable row of the task list; show() rebinds it to another task."""
+
+    def __init__(self, master, height, on_action):
+        super().__init__(master, corner_radius=8, height=height)
+        self.pack_propagate(False)
+        self.task_id = None
+        self.shown = None  # last rendered values, to skip redundant configure calls
+
+        left = ctk.CTkFrame(self, fg_color="transparent")
+        left.pack(side="left", fill="both", expand=True, padx=8, pady=8)
+        self.title = ctk.CTkLabel(left, text="", anchor="w", font=("Arial", 13, "bold"))
+        self.title.pack(fill="x")
+        self.notes = ctk.CTkLabel(left, text="", anchor="w", text_color="gray")
+        self.notes.pack(fill="x", pady=(4, 0))
+
+        right = ctk.CTkFrame(self, width=120, fg_color="transparent")
+        right.pack(side="right", padx=8, pady=8)
+        self.done_btn = ctk.CTkButton(right, text="○", width=36, command=lambda: on_action("toggle", self.task_id))
+        self.done_btn.pack(side="left", padx=6)
+        ctk.CTkButton(right, text="✏️", width=36, command=lambda: on_action("edit", self.task_id)).pack(side="left", padx=6)
+        ctk.CTkButton(right, text="🗑️", width=36, command=lambda: on_action("delete", self.task_id)).pack(side="left", padx=6)
+
+        # priority badge
+        self.badge = ctk.CTkLabel(self, text="", width=80, anchor="center", corner_radius=10, text_color="white")
+        self.badge.place(relx=0.6, rely=0.5, anchor="w")
+
+    def show(self, task, date_key=None):
+        self.task_id = task.id
+        time_txt = f" ⏰ {task.time}" if task.time else ""
+        date_txt = f"{date_key} • " if date_key else ""
+        notes = task.notes
+        if len(notes) >= 120:
+            notes = notes[:117] + "..."
+        priority = task.priority
+        values = (f"{date_txt}{task.text}{time_txt}", notes, task.done, priority)
+        if values == self.shown:
+            return
+        self.shown = values
+        self.title.configure(text=values[0])
+        self.notes.configure(text=notes)
+        self.done_btn.configure(text="✔" if values[2] else "○")
+        self.badge.configure(text=priority, fg_color=PRIORITY_COLORS.get(priority, "#1f6feb"))
+
+
+class VirtualTaskList(ctk.CTkFrame):
+    """Scrollable task list that only builds widgets for the rows in view.
+
+    A pool of TaskRow widgets, one per visible slot, is placed over the
+    viewport and rebound to other tasks as the list scrolls, so redrawing
+    costs the same for ten tasks or ten thousand.
+    """
+    ROW_HEIGHT = 76  # unscaled pixels, including the gap between rows
+
+    def __init__(self, master, on_action, empty_text="", date_of=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_action = on_action  # called with (action, task id)
+        self.date_of = date_of  # task -> date key, for lists that span dates
+        self.show_dates = False
+        self.items = []
+        self.offset = 0  # unscaled pixels scrolled from the top
+        self.rows = []
+
+        self.viewport = ctk.CTkFrame(self, fg_color="transparent")
+        self.viewport.pack(side="left", expand=True, fill="both")
+        self.scrollbar = ctk.CTkScrollbar(self, command=self.yview)
+        self.scrollbar.pack(side="right", fill="y", pady=8)
+        self.empty_label = ctk.CTkLabel(self.viewport, text=empty_text, text_color="gray", font=("Arial", 14))
+
+        self.viewport.bind("<Configure>", lambda e: self.render())
+        self.bind_wheel(self.viewport)
+
+    def bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.scroll_rows(-1 if e.delta > 0 else 1))
+        widget.bind("<Button-4>", lambda e: self.scroll_rows(-1))
+        widget.bind("<Button-5>", lambda e: self.scroll_rows(1))
+
+    def set_items(self, items, show_dates=False):
+        self.items = items
+        self.show_dates = show_dates
+        self.offset = min(self.offset, self.max_offset())
+        self.render()
+
+    def refresh_item(self, task):
+        # update one task in place without touching the other rows
+        for row in self.rows:
+            if row.task_id == task.id and row.winfo_ismapped():
+                row.show(task, self.row_date(task))
+
+    def row_date(self, task):
+        return self.date_of(task) if self.show_dates and self.date_of else None
+
+    def view_height(self):
+        return self.viewport.winfo_height() / ctk.ScalingTracker.get_widget_scaling(self)
+
+    def max_offset(self):
+        return max(0, len(self.items) * self.ROW_HEIGHT - self.view_height())
+
+    def yview(self, *args):
+        # protocol of the scrollbar command: ("moveto", f) or ("scroll", n, "units"|"pages")
+        if args[0] == "moveto":
+            self.offset = float(args[1]) * len(self.items) * self.ROW_HEIGHT
+        elif args[0] == "scroll":
+            step = self.view_height() if args[2] == "pages" else self.ROW_HEIGHT
+            self.offset += int(args[1]) * step
+        self.offset = max(0, min(self.offset, self.max_offset()))
+        self.render()
+
+    def scroll_rows(self, n):
+        self.yview("scroll", n, "units")
+
+    @timed()
+    def render(self):
+        height = self.view_height()
+        if not self.items:
+            for row in self.rows:
+                row.place_forget()
+            self.empty_label.place(relx=0.5, rely=0.5, anchor="center")
+            self.scrollbar.set(0.0, 1.0)
+            return
+        self.empty_label.place_forget()
+
+        # grow the pool to cover the viewport; rows are never destroyed
+        needed = int(height // self.ROW_HEIGHT) + 2
+        while len(self.rows) < needed:
+            row = TaskRow(self.viewport, self.ROW_HEIGHT - 8, self.on_action)
+            for w in (row, row.title, row.notes):
+                self.bind_wheel(w)
+            self.rows.append(row)
+
+        first = int(self.offset // self.ROW_HEIGHT)
+        for slot, row in enumerate(self.rows):
+            index = first + slot
+            if index < len(self.items) and slot < needed:
+                row.show(self.items[index], self.row_date(self.items[index]))
+                row.place(relx=0.5, y=index * self.ROW_HEIGHT - self.offset + 4, relwidth=0.96, anchor="n")
+            else:
+                row.task_id = None
+                row.place_forget()
+
+        total = len(self.items) * self.ROW_HEIGHT
+        self.scrollbar.set(self.offset / total, min(1.0, (self.offset + height) / total))
+
+
+class ChatView(ctk.CTkScrollableFrame):
+    """One conversation, showing a bounded window of its messages.
+
+    Only the bubbles of messages[first:end] exist. New messages are appended
+    as bubbles without touching the others; scrolling to the top or bottom
+    edge builds the next PAGE of older or newer bubbles and drops the same
+    number from the other end once more than WINDOW exist. messages is the
+    conversation's own list, which only ever grows: at the end as messages
+    arrive and at the front when load_older() returns earlier history.
+    """
+    PAGE = 30
+    WINDOW = 120
+    EDGE = 0.02  # scroll fraction counted as "at the top/bottom"
+
+    def __init__(self, master, messages, load_older=None, **kwargs):
+        super().__init__(master, corner_radius=6, fg_color="#F7FAFF", **kwargs)
+        self.messages = messages
+        self.load_older = load_older  # -> earlier messages not in the list yet, [] when none are left
+        self.more_older = load_older is not None
+        self.bubbles = []  # frames for messages[first:end], oldest first
+        self.first = self.end = max(0, len(messages) - self.PAGE)
+        self.paging = False
+        # CTkScrollableFrame has no scroll event: watch the canvas -> scrollbar callback
+        canvas = self._parent_canvas
+        set_scrollbar = self._scrollbar.set
+
+        def on_scroll(top, bottom):
+            set_scrollbar(top, bottom)
+            self.on_scroll(float(top), float(bottom))
+        canvas.configure(yscrollcommand=on_scroll)
+        self.sync()
+
+    def bubble(self, m, before=None):
+        is_me = (m.get("sender") == "You")
+        bubble = ctk.CTkFrame(self, corner_radius=12, fg_color="#D1F7E9" if is_me else "#E8F0FF")
+        # show text and timestamp, name for incoming
+        header_text = ("" if is_me else f"{m.get('sender')} • ")
+        lbl = ctk.CTkLabel(bubble, text=f"{header_text}{m['text']}\n{m['time']}", wraplength=800, anchor="w")
+        lbl.pack(padx=12, pady=8)
+        if before is None:
+            bubble.pack(anchor="e" if is_me else "w", pady=6, padx=12)
+        else:
+            bubble.pack(anchor="e" if is_me else "w", pady=6, padx=12, before=before)
+        return bubble
+
+    def sync(self):
+        """Add bubbles for messages that arrived since the last call"""
+        if self.end < len(self.messages) - self.PAGE:
+            # scrolled far back: jump to the latest page instead of building the gap
+            self.rebuild(len(self.messages) - self.PAGE)
+        else:
+            for m in self.messages[self.end:]:
+                self.bubbles.append(self.bubble(m))
+            self.end = len(self.messages)
+            self.trim_oldest()
+        self.scroll_to_end()
+
+    def rebuild(self, first):
+        for b in self.bubbles:
+            b.destroy()
+        self.bubbles = []
+        self.first = self.end = max(0, first)
+        for m in self.messages[self.first:self.first + self.PAGE]:
+            self.bubbles.append(self.bubble(m))
+        self.end = self.first + len(self.bubbles)
+
+    def trim_oldest(self):
+        while len(self.bubbles) > self.WINDOW:
+            self.bubbles.pop(0).destroy()
+            self.first += 1
+
+    def trim_newest(self):
+        while len(self.bubbles) > self.WINDOW:
+            self.bubbles.pop().destroy()
+            self.end -= 1
+
+    def scroll_to_end(self):
+        # after the new bubbles have been laid out, without forcing a layout pass
+        self.after_idle(lambda: self._parent_canvas.yview_moveto(1.0))
+
+    def on_scroll(self, top, bottom):
+        if self.paging:
+            return
+        if top <= self.EDGE and (self.first > 0 or self.more_older):
+            self.paging = True
+            self.after_idle(self.show_older)
+        elif bottom >= 1.0 - self.EDGE and self.end < len(self.messages):
+            self.paging = True
+            self.after_idle(self.show_newer)
+
+    def content_height(self):
+        box = self._parent_canvas.bbox("all")
+        return box[3] - box[1] if box else 0
+
+    def show_older(self):
+        # prepend a page above the first bubble, then keep the visible part in place
+        if self.first == 0:
+            older = self.load_older() if self.more_older else []
+            if not older:
+                self.more_older = False
+                self.paging = False
+                return
+            self.messages[:0] = older
+            self.first += len(older)
+            self.end += len(older)
+        if not self.bubbles:
+            self.rebuild(self.first - self.PAGE)
+            self.paging = False
+            return
+        anchor = self.bubbles[0]
+        anchor_y = anchor.winfo_y()
+        top = self._parent_canvas.canvasy(0)
+        start = max(0, self.first - self.PAGE)
+        self.bubbles[:0] = [self.bubble(m, before=anchor) for m in self.messages[start:self.first]]
+        self.first = start
+        self.trim_newest()
+        # once the new bubbles are laid out and the scroll region has followed
+        self.after(10, lambda: self.keep_position(anchor, anchor_y, top))
+
+    def keep_position(self, anchor, anchor_y, top):
+        height = self.content_height()
+        if height and anchor.winfo_exists():
+            self._parent_canvas.yview_moveto((top + anchor.winfo_y() - anchor_y) / height)
+        self.paging = False
+
+    def show_newer(self):
+        stop = min(len(self.messages), self.end + self.PAGE)
+        for m in self.messages[self.end:stop]:
+            self.bubbles.append(self.bubble(m))
+        self.end = stop
+        self.trim_oldest()
+        self.paging = False
+
+
 class TodoApp(ctk.CTk):
     STORAGE = Path.home() / ".tegbar_tasks.json"
-    TEAM_STORAGE = Path.home() / ".tegbar_team.json"
+    JOURNAL = Path.home() / ".tegbar_tasks.log"
+    TEAM_STORAGE = Path.home() / ".tegbar_team"
+    LEGACY_TEAM_STORAGE = Path.home() / ".tegbar_team.json"
+    # "host:port" of a chat server; without it a loopback stand-in is started
+    CHAT_SERVER = os.environ.get("TEGBAR_CHAT", "")
+    CHAT_USER = os.environ.get("TEGBAR_CHAT_USER", "You")  # who this app signs in as on that server
+    SILENT_CONTACTS = ("Neo",)  # never answer on the stand-in
+    AI_DELAY_MS = 600  # the assistant's "thinking" pause
+    # page -> (builder, store it shows); pages are built on first show_page()
+    PAGES = {
+        "tasks": ("create_tasks_page", "tasks"),
+        "team": ("create_team_page", "team"),
+        "ai": ("create_ai_page", "tasks"),
+        "settings": ("create_settings_page", None),
+        "history": ("create_history_page", "tasks"),
+    }
 
     def __init__(self):
+        self.started = time.perf_counter()
+        self.startup_times = {}  # phase -> ms after start, see mark_startup()
         super().__init__()
         self.title("Tegbar List — Premium")
         self.geometry("1100x650")
@@ -25,14 +1247,31 @@ class TodoApp(ctk.CTk):
         # data
         self.week_offset = 0  # offset in days from today for week display
         self.selected_date = datetime.now().date()
-        self.tasks_by_date = {}  # { "YYYY-MM-DD": [ {text, time, priority, done, notes, created} ] }
+        self.tasks_by_date = {}  # { "YYYY-MM-DD": [ {id, text, time, priority, done, notes, created} ] }
+        self.task_index = {}  # { id: (date_key, task) } kept in step with tasks_by_date
+        self.search_index = TaskSearchIndex()
+        self.summary = TaskSummary()
+        self.analytics = TaskAnalytics(self.summary)
+        self.history_version = None  # summary.version the History page shows
         self.day_buttons = {}
-        self.edit_index = None
+        self.edit_id = None
         self.search_query = ctk.StringVar()
-
-        self.load_tasks()
-        # load team chat data
-        self.load_team_messages()
+        self.search_all_dates = ctk.BooleanVar(value=False)
+        self.journal = TaskJournal(self.STORAGE, self.JOURNAL)
+        # coroutines (loads, chat, AI replies) run on the Tk thread, and everything
+        # other threads want done to the UI or the stores is posted to the same loop
+        self.bridge = AsyncBridge(self)
+        self.workers = WorkerPool(self.bridge)
+        self.saver = SaveScheduler(on_error=lambda name, e: self.bridge.post(self.on_save_error, name, e))
+        self.search_pipeline = SearchPipeline(self, self.workers, self.run_search, self.show_search_results)
+        self.transfer = None  # running tegbar_io.Transfer, one at a time
+        self.chat_store = ChatStore(self.TEAM_STORAGE, self.LEGACY_TEAM_STORAGE)
+        self.team_contacts = []
+        self.team_messages = {}  # contact -> loaded part of the conversation, see conversation()
+        self.chat_session = None  # tegbar_chat.ChatSession, started once the team store is read
+        self.chat_state = "offline"
+        self.tasks_load_failed = False  # see install_tasks()
+        self.loaded = set()  # stores ("tasks", "team") read so far
 
         # layout
         self.sidebar = ctk.CTkFrame(self, width=220, corner_radius=12)
@@ -50,78 +1289,176 @@ class TodoApp(ctk.CTk):
         self.container.pack(expand=True, fill="both", padx=12, pady=12)
 
         self.pages = {}
-        self.pages["tasks"] = self.create_tasks_page()
-        self.pages["team"] = self.create_team_page()
-        self.pages["ai"] = self.create_ai_page()
-        self.pages["settings"] = self.create_settings_page()
-        self.pages["history"] = self.create_history_page()
-
-        for page in self.pages.values():
-            page.place(relwidth=1, relheight=1)
+        self.current_page = None
+        # shown in place of a page whose data is still being read
+        self.loading_page = ctk.CTkFrame(self.container)
+        self.loading_label = ctk.CTkLabel(self.loading_page, text="", text_color="gray", font=("Arial", 16))
+        self.loading_label.place(relx=0.5, rely=0.4, anchor="center")
+        self.loading_page.place(relwidth=1, relheight=1)
 
         self.show_page("tasks")
         self.protocol("WM_DELETE_WINDOW", self.on_close)
 
+        # the stores are read off the Tk thread so the window appears at once
+        self.bridge.spawn(self.load_store("tasks", self.read_tasks, self.install_tasks))
+        self.bridge.spawn(self.load_store("team", self.read_team_messages, self.install_team_messages))
+        self.after_idle(lambda: self.mark_startup("window"))
+
+    # ---------- startup ----------
+    async def load_store(self, name, read, install):
+        # read() runs on a worker thread and must not touch Tk; install(result)
+        # runs on the Tk thread, after which pages showing this store can open
+        install(await self.workers.run(read))
+        self.loaded.add(name)
+        self.mark_startup(name)
+        if self.current_page and self.PAGES[self.current_page][1] == name:
+            self.show_page(self.current_page)
+
+    def mark_startup(self, phase):
+        # shown on the Settings page, and in the TEGBAR_PROFILE report when enabled
+        elapsed = time.perf_counter() - self.started
+        self.startup_times[phase] = elapsed * 1000
+        record(f"startup: {phase} ready", elapsed)
+
+    def startup_report(self):
+        return ", ".join(f"{phase} {ms:.0f} ms" for phase, ms in self.startup_times.items())
+
     # ---------- persistence ----------
-    def load_tasks(self):
-        if self.STORAGE.exists():
+    @timed()
+    def read_tasks(self):
+        # runs on a loader thread; builds a complete store for install_tasks()
+        tasks_by_date, task_index = {}, {}
+        search_index, summary = TaskSearchIndex(), TaskSummary()
+        migrated = False
+        error = None
+        if self.STORAGE.exists() or self.JOURNAL.exists():
             try:
-                data = json.loads(self.STORAGE.read_text(encoding="utf-8"))
+                data = self.journal.load()
                 # validate/normalize
-                self.tasks_by_date = {}
                 for date_str, tasks in data.items():
                     normalized = []
                     for t in tasks:
-                        normalized.append({
-                            "text": t.get("text", ""),
-                            "time": t.get("time", ""),
-                            "priority": t.get("priority", "Normal"),
-                            "done": bool(t.get("done", False)),
-                            "notes": t.get("notes", ""),
-                            "created": t.get("created", datetime.now().isoformat())
-                        })
-                    self.tasks_by_date[date_str] = normalized
-            except Exception:
-                self.tasks_by_date = {}
-        else:
-            self.tasks_by_date = {}
+                        task_id = t.get("id")
+                        if not task_id or task_id in task_index:
+                            task_id = new_task_id()
+                            migrated = True
+                        task = Task.from_dict(t, task_id)
+                        normalized.append(task)
+                        task_index[task_id] = (date_str, task)
+                        summary.add(date_str, task.done)
+                    tasks_by_date[date_str] = normalized
+                search_index.add_many(task for _, task in task_index.values())
+            except Exception as e:
+                tasks_by_date, task_index = {}, {}
+                search_index, summary = TaskSearchIndex(), TaskSummary()
+                migrated = False
+                error = e
+                self.journal.renumber_after_failed_load()
+        return tasks_by_date, task_index, search_index, summary, migrated, error
+
+    @timed()
+    def install_tasks(self, store):
+        self.tasks_by_date, self.task_index, self.search_index, self.summary, migrated, error = store
+        self.analytics = TaskAnalytics(self.summary)
+        self.history_version = None
+        if error is not None:
+            # the files on disk are all there is: never snapshot the empty store over them
+            self.tasks_load_failed = True
+            msg.showerror("Load Error", f"Could not read your tasks: {error}\n"
+                                        f"Nothing will be overwritten; changes made now are only logged.")
+        elif migrated:
+            # persist the new ids before any journal record refers to them
+            self.save_tasks()
 
+    @timed()
     def save_tasks(self):
+        # full snapshot from memory; only safe once background saves are stopped
         try:
-            self.STORAGE.write_text(json.dumps(self.tasks_by_date, indent=2, ensure_ascii=False), encoding="utf-8")
+            self.journal.compact(self.tasks_by_date)
         except Exception as e:
             msg.showerror("Save Error", f"Could not save tasks: {e}")
 
-    def load_team_messages(self):
-        try:
-            if self.TEAM_STORAGE.exists():
-                data = json.loads(self.TEAM_STORAGE.read_text(encoding="utf-8"))
-                # ensure structure
-                self.team_messages = {k: v if isinstance(v, list) else [] for k, v in data.items()}
-            else:
-                # seed example contacts
-                self.team_messages = {
-                    "Jonas": [{"sender":"Jonas","text":"Hello team!","time":"09:12"}],
-                    "Neo": [], "Abraham": [], "Jessica": []
-                }
-        except Exception:
-            self.team_messages = {}
+    def log_task_change(self, op, date_key=None, **fields):
+        # safe from any thread: the record is queued and written in the background
+        self.journal.append(op, date_key, **fields)
+        self.saver.schedule("tasks", self.persist_tasks)
+
+    def add_task(self, date_key, task):
+        self.tasks_by_date.setdefault(date_key, []).append(task)
+        self.task_index[task.id] = (date_key, task)
+        self.search_index.add(task)
+        self.summary.add(date_key, task.done)
+        self.log_task_change("add", date_key, task=task)
+
+    def add_tasks(self, items):
+        # bulk add of (date_key, task) pairs as a single journal record
+        for date_key, task in items:
+            self.tasks_by_date.setdefault(date_key, []).append(task)
+            self.task_index[task.id] = (date_key, task)
+            self.summary.add(date_key, task.done)
+        self.search_index.add_many(task for _, task in items)
+        self.log_task_change("add_many", tasks=items)
+
+    @timed()
+    def persist_tasks(self):
+        # runs on the save worker
+        self.journal.write_pending()
+        if self.journal.pending >= self.journal.COMPACT_EVERY:
+            self.journal.compact()
+
+    def on_save_error(self, name, error):
+        # team chat saves have always failed silently
+        if name == "tasks":
+            msg.showerror("Save Error", f"Could not save tasks: {error}")
 
-    def save_team_messages(self):
+    @timed()
+    def read_team_messages(self):
+        # runs on a loader thread; only the manifest is read, histories wait for conversation()
         try:
-            self.TEAM_STORAGE.write_text(json.dumps(self.team_messages, indent=2, ensure_ascii=False), encoding="utf-8")
+            return self.chat_store.open()
         except Exception:
-            pass
+            return []
+
+    def install_team_messages(self, contacts):
+        self.team_contacts = contacts
+        self.start_chat()
+
+    def conversation(self, name):
+        # the loaded part of a chat, reading its newest segment on first use
+        messages = self.team_messages.get(name)
+        if messages is None:
+            messages = self.team_messages[name] = self.chat_store.load_newest(name, ChatView.PAGE)
+        return messages
+
+    def add_team_message(self, name, message):
+        self.conversation(name).append(message)
+        self.chat_store.append(name, message)
+        self.saver.schedule("team", self.chat_store.write_pending)
 
     # ---------- UI navigation ----------
+    @timed()
     def show_page(self, name):
-        self.pages[name].tkraise()
+        self.current_page = name
+        builder, store = self.PAGES[name]
+        if store is not None and store not in self.loaded:
+            self.loading_label.configure(text=f"Loading {store}...")
+            self.loading_page.tkraise()
+            return
+        page = self.pages.get(name)
+        if page is None:
+            start = time.perf_counter()
+            page = self.pages[name] = getattr(self, builder)()
+            page.place(relwidth=1, relheight=1)
+            self.startup_times[f"{name} page"] = (time.perf_counter() - start) * 1000
+        page.tkraise()
         if name == "tasks":
             self.draw_days()
             self.draw_tasks()
         elif name == "history":
             # refresh history stats when showing the page
             self.draw_history()
+        elif name == "settings":
+            self.draw_storage_stats()
 
     # ---------- tasks page ----------
     def create_tasks_page(self):
@@ -135,7 +1472,11 @@ class TodoApp(ctk.CTk):
         # search bar
         search_entry = ctk.CTkEntry(header, width=260, placeholder_text="Search tasks...", textvariable=self.search_query)
         search_entry.pack(side="right", padx=(6, 0))
-        search_entry.bind("<KeyRelease>", lambda e: self.draw_tasks())
+        search_entry.bind("<KeyRelease>", lambda e: self.on_search_key())
+        ctk.CTkCheckBox(header, text="All dates", variable=self.search_all_dates, width=90,
+                        command=self.draw_tasks).pack(side="right", padx=(6, 0))
+        self.search_status = ctk.CTkLabel(header, text="", text_color="gray")
+        self.search_status.pack(side="right", padx=(6, 0))
 
         # week navigation
         nav = ctk.CTkFrame(page, fg_color="transparent")
@@ -152,9 +1493,11 @@ class TodoApp(ctk.CTk):
         body = ctk.CTkFrame(page, corner_radius=12, width=10)
         body.pack(expand=True, fill="both", padx=18, pady=12)
 
-        # left: tasks list
-        self.task_frame = ctk.CTkFrame(body, corner_radius=8)
-        self.task_frame.pack(side="left", expand=True, fill="both", padx=(12, 8), pady=12)
+        # left: tasks list (only the visible rows are materialized)
+        self.task_list = VirtualTaskList(body, self.on_task_action, corner_radius=8,
+                                         date_of=lambda t: self.task_index.get(t.id, (None,))[0],
+                                         empty_text="No tasks for this day.\nClick + to add one.")
+        self.task_list.pack(side="left", expand=True, fill="both", padx=(12, 8), pady=12)
 
         # right: details / quick actions
         right = ctk.CTkFrame(body, width=30, corner_radius=8)
@@ -173,7 +1516,14 @@ class TodoApp(ctk.CTk):
 
         # Export / import
         ctk.CTkLabel(right, text="Export / Import", font=("Arial", 12, "bold")).pack(pady=(6, 6))
-        ctk.CTkButton(right, text="Export JSON", command=self.export_json).pack(padx=12, pady=6)
+        self.transfer_format = ctk.CTkOptionMenu(right, values=["JSON", "NDJSON", "CSV"], width=120)
+        self.transfer_format.set("JSON")
+        self.transfer_format.pack(padx=12, pady=6)
+        ctk.CTkButton(right, text="Export", command=self.export_tasks).pack(padx=12, pady=6)
+        ctk.CTkButton(right, text="Import", command=self.import_tasks).pack(padx=12, pady=6)
+        self.transfer_progress = ctk.CTkProgressBar(right, width=120)
+        self.transfer_progress.set(0)
+        self.transfer_status = ctk.CTkLabel(right, text="", text_color="gray")
         ctk.CTkButton(right, text="Clear Completed", command=self.clear_completed).pack(padx=12, pady=6)
 
         # floating add button
@@ -183,6 +1533,7 @@ class TodoApp(ctk.CTk):
         self.draw_tasks()
         return page
 
+    @timed()
     def draw_days(self):
         for w in self.days_frame.winfo_children():
             w.destroy()
@@ -218,88 +1569,71 @@ class TodoApp(ctk.CTk):
             else:
                 btn.configure(fg_color="transparent", text_color="black")
 
+    @timed()
     def draw_tasks(self):
-        for w in self.task_frame.winfo_children():
-            w.destroy()
-
         date_key = self.selected_date.isoformat()
-        tasks = list(self.tasks_by_date.get(date_key, []))
-        query = self.search_query.get().strip().lower()
-        if query:
-            tasks = [t for t in tasks if query in t["text"].lower() or query in t.get("notes", "").lower()]
-
-        if not tasks:
-            ctk.CTkLabel(self.task_frame, text="No tasks for this day.\nClick + to add one.",
-                         text_color="gray", font=("Arial", 14)).pack(expand=True)
+        query = self.search_query.get().strip()
+        if not query:
+            self.search_pipeline.cancel()
+            self.search_status.configure(text="")
+            self.task_list.set_items(list(self.tasks_by_date.get(date_key, [])))
             return
+        self.search_pipeline.submit(query, self.search_all_dates.get(), date_key, debounce=False)
 
-        for index, task in enumerate(tasks):
-            txt = task["text"]
-            time = f" ⏰ {task['time']}" if task.get("time") else ""
-            display = f"{txt}{time}"
-            color = {"High": "#ff6363", "Normal": "#1f6feb", "Low": "#8ea28e"}.get(task.get("priority"), "#1f6feb")
-            fg = "#065f46" if task.get("done") else color
-
-            frame = ctk.CTkFrame(self.task_frame, corner_radius=8)
-            frame.pack(fill="x", padx=12, pady=8)
-
-            left = ctk.CTkFrame(frame, fg_color="transparent")
-            left.pack(side="left", fill="both", expand=True, padx=8, pady=8)
-            title = ctk.CTkLabel(left, text=display, anchor="w", font=("Arial", 13, "bold"))
-            title.pack(fill="x")
-            notes = task.get("notes", "")
-            if notes:
-                ctk.CTkLabel(left, text=notes if len(notes) < 120 else notes[:117] + "...", anchor="w",
-                             text_color="gray").pack(fill="x", pady=(4, 0))
-
-            right = ctk.CTkFrame(frame, width=120, fg_color="transparent")
-            right.pack(side="right", padx=8, pady=8)
-
-            done_btn = ctk.CTkButton(right, text="✔" if task.get("done") else "○", width=36, command=lambda i=index: self.toggle_done_by_list(i, tasks))
-            done_btn.pack(side="left", padx=6)
-
-            ctk.CTkButton(right, text="✏️", width=36, command=lambda i=index: self.edit_task_by_list(i, tasks)).pack(side="left", padx=6)
-            ctk.CTkButton(right, text="🗑️", width=36, command=lambda i=index: self.delete_task_by_list(i, tasks)).pack(side="left", padx=6)
-
-            # priority badge
-            ctk.CTkLabel(frame, text=task.get("priority", "Normal"), width=80, anchor="center",
-                         fg_color=color, corner_radius=10, text_color="white").place(relx=0.6, rely=0.5, anchor="w")
-
-    # helpers for list-based index (because filtered list is used)
-    def toggle_done_by_list(self, list_index, visible_tasks):
-        # map to actual date list index
-        date_key = self.selected_date.isoformat()
-        actual_tasks = self.tasks_by_date.get(date_key, [])
-        task_to_toggle = visible_tasks[list_index]
-        for idx, t in enumerate(actual_tasks):
-            if t is task_to_toggle or (t["text"] == task_to_toggle["text"] and t["created"] == task_to_toggle["created"]):
-                actual_tasks[idx]["done"] = not actual_tasks[idx].get("done", False)
-                break
-        self.save_tasks()
-        self.draw_tasks()
-
-    def edit_task_by_list(self, list_index, visible_tasks):
-        task = visible_tasks[list_index]
-        # find actual index
-        date_key = self.selected_date.isoformat()
-        actual_tasks = self.tasks_by_date.get(date_key, [])
-        idx = next((i for i, t in enumerate(actual_tasks) if t["created"] == task["created"]), None)
-        if idx is not None:
-            self.open_add_task(edit_index=idx)
-
-    def delete_task_by_list(self, list_index, visible_tasks):
-        task = visible_tasks[list_index]
-        date_key = self.selected_date.isoformat()
-        actual_tasks = self.tasks_by_date.get(date_key, [])
-        idx = next((i for i, t in enumerate(actual_tasks) if t["created"] == task["created"]), None)
-        if idx is not None:
-            self.delete_task(idx)
+    def on_search_key(self):
+        if not self.search_query.get().strip():
+            self.draw_tasks()
+            return
+        self.search_pipeline.submit(self.search_query.get().strip(), self.search_all_dates.get(),
+                                    self.selected_date.isoformat())
+
+    @timed()
+    def run_search(self, args, cancelled):
+        # runs on the search worker thread
+        query, all_dates, date_key = args
+        ids = self.search_index.search(query, cancelled=cancelled)
+        if ids is None:
+            return None
+        tasks = []
+        for task_id in ids:
+            entry = self.task_index.get(task_id)
+            if entry and (all_dates or entry[0] == date_key):
+                tasks.append(entry[1])
+        return tasks, all_dates
+
+    @timed()
+    def show_search_results(self, result):
+        tasks, all_dates = result
+        self.task_list.set_items(tasks, show_dates=all_dates)
+        self.search_status.configure(text=f"{len(tasks)} found")
+
+    def on_task_action(self, action, task_id):
+        if action == "toggle":
+            self.toggle_done(task_id)
+        elif action == "edit":
+            self.open_add_task(edit_id=task_id)
+        elif action == "delete":
+            self.delete_task(task_id)
+
+    @timed()
+    def toggle_done(self, task_id):
+        entry = self.task_index.get(task_id)
+        if entry is None:
+            return
+        date_key, task = entry
+        task.done = not task.done
+        self.summary.set_done(date_key, task.done)
+        self.log_task_change("update", date_key, id=task_id, fields={"done": task.done})
+        # the search filter doesn't look at "done", so only this row changes
+        self.task_list.refresh_item(task)
 
     # add / edit / delete
-    def open_add_task(self, edit_index=None):
-        self.edit_index = edit_index
+    def open_add_task(self, edit_id=None):
+        if edit_id is not None and edit_id not in self.task_index:
+            return
+        self.edit_id = edit_id
         self.popup = ctk.CTkToplevel(self)
-        self.popup.title("Edit Task" if edit_index is not None else "New Task")
+        self.popup.title("Edit Task" if edit_id is not None else "New Task")
         self.popup.geometry("420x490")
         self.popup.transient(self)
         self.popup.grab_set()
@@ -327,14 +1661,13 @@ class TodoApp(ctk.CTk):
         ctk.CTkButton(btn_frame, text="Cancel", command=self.popup.destroy).pack(side="left", padx=8)
 
         # populate if editing
-        if edit_index is not None:
-            date_key = self.selected_date.isoformat()
-            task = self.tasks_by_date.get(date_key, [])[edit_index]
+        if edit_id is not None:
+            _, task = self.task_index[edit_id]
             if task:
-                self.task_input.insert(0, task.get("text", ""))
-                self.time_input.insert(0, task.get("time", ""))
-                self.priority_input.set(task.get("priority", "Normal"))
-                self.notes_input.insert("0.0", task.get("notes", ""))
+                self.task_input.insert(0, task.text)
+                self.time_input.insert(0, task.time)
+                self.priority_input.set(task.priority)
+                self.notes_input.insert("0.0", task.notes)
 
     def save_task(self):
         text = self.task_input.get().strip()
@@ -345,38 +1678,36 @@ class TodoApp(ctk.CTk):
             msg.showwarning("Validation", "Task title cannot be empty.")
             return
 
-        date_key = self.selected_date.isoformat()
-        self.tasks_by_date.setdefault(date_key, [])
-        if self.edit_index is None:
-            self.tasks_by_date[date_key].append({
-                "text": text,
-                "time": time_txt,
-                "priority": priority,
-                "done": False,
-                "notes": notes,
-                "created": datetime.now().isoformat()
-            })
+        if self.edit_id is None:
+            self.add_task(self.selected_date.isoformat(),
+                          Task(new_task_id(), text, time_txt, priority, notes=notes))
         else:
-            t = self.tasks_by_date[date_key][self.edit_index]
-            t.update({
+            date_key, t = self.task_index[self.edit_id]
+            fields = {
                 "text": text,
                 "time": time_txt,
                 "priority": priority,
                 "notes": notes,
-            })
-        self.save_tasks()
+            }
+            t.update(fields)
+            self.search_index.update(t)
+            self.summary.touch(date_key)
+            self.log_task_change("update", date_key, id=self.edit_id, fields=fields)
         self.popup.destroy()
         self.draw_tasks()
 
-    def delete_task(self, index):
-        date_key = self.selected_date.isoformat()
-        if not (date_key in self.tasks_by_date and 0 <= index < len(self.tasks_by_date[date_key])):
+    def delete_task(self, task_id):
+        if task_id not in self.task_index:
             return
         if msg.askyesno("Delete", "Are you sure you want to delete this task?"):
-            del self.tasks_by_date[date_key][index]
-            if not self.tasks_by_date[date_key]:
+            date_key, task = self.task_index.pop(task_id)
+            self.search_index.remove(task_id)
+            self.summary.remove(date_key, task.done)
+            tasks = self.tasks_by_date[date_key]
+            del tasks[next(i for i, t in enumerate(tasks) if t is task)]
+            if not tasks:
                 del self.tasks_by_date[date_key]
-            self.save_tasks()
+            self.log_task_change("delete", date_key, id=task_id)
             self.draw_tasks()
 
     def quick_add(self):
@@ -385,44 +1716,151 @@ class TodoApp(ctk.CTk):
             return
         time_txt = self.quick_time.get().strip()
         priority = self.quick_priority.get()
-        date_key = self.selected_date.isoformat()
-        self.tasks_by_date.setdefault(date_key, []).append({
-            "text": text,
-            "time": time_txt,
-            "priority": priority,
-            "done": False,
-            "notes": "",
-            "created": datetime.now().isoformat()
-        })
+        self.add_task(self.selected_date.isoformat(), Task(new_task_id(), text, time_txt, priority))
         self.quick_text.delete(0, "end")
         self.quick_time.delete(0, "end")
         self.quick_priority.set("Normal")
-        self.save_tasks()
         self.draw_tasks()
 
     def clear_completed(self):
         changed = False
         for date_key in list(self.tasks_by_date.keys()):
             before = len(self.tasks_by_date[date_key])
-            self.tasks_by_date[date_key] = [t for t in self.tasks_by_date[date_key] if not t.get("done")]
+            kept = []
+            for t in self.tasks_by_date[date_key]:
+                if t.done:
+                    del self.task_index[t.id]
+                    self.search_index.remove(t.id)
+                else:
+                    kept.append(t)
+            self.tasks_by_date[date_key] = kept
             if not self.tasks_by_date[date_key]:
                 del self.tasks_by_date[date_key]
             if len(self.tasks_by_date.get(date_key, [])) != before:
                 changed = True
         if changed:
-            self.save_tasks()
+            self.summary.clear_done()
+            self.log_task_change("clear_done")
             self.draw_tasks()
             msg.showinfo("Cleared", "Completed tasks removed.")
         else:
             msg.showinfo("Nothing to clear", "No completed tasks found.")
 
-    def export_json(self):
+    # ---------- import / export ----------
+    def start_transfer(self, text):
+        if self.transfer is not None:
+            msg.showinfo("Busy", "An import or export is already running.")
+            return False
+        self.transfer_progress.set(0)
+        self.transfer_progress.pack(padx=12, pady=(6, 0))
+        self.transfer_status.configure(text=text)
+        self.transfer_status.pack(padx=12, pady=(0, 6))
+        return True
+
+    def end_transfer(self):
+        self.transfer = None
+        self.transfer_progress.pack_forget()
+        self.transfer_status.pack_forget()
+
+    def export_tasks(self):
+        import tegbar_io  # loaded on first use instead of at startup
+        fmt = self.transfer_format.get().lower()
+        if not self.start_transfer("Exporting..."):
+            return
+        dest = Path.cwd() / f"tegbar_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+        # the lists are copied here; records are built and written on the worker
+        days = [(date_key, list(tasks)) for date_key, tasks in self.tasks_by_date.items()]
+        total = sum(len(tasks) for _, tasks in days) or 1
+
+        def records(transfer):
+            for date_key, tasks in days:
+                for task in tasks:
+                    transfer.check()  # a cancelled export stops here and its .part file is removed
+                    yield {"date": date_key, **task.to_dict()}
+
+        def work(transfer):
+            return tegbar_io.write_records(dest, records(transfer), fmt,
+                                           progress=lambda count: transfer.report(count, count / total))
+
+        def done(count):
+            self.end_transfer()
+            msg.showinfo("Exported", f"Exported {count} tasks to {dest}")
+
+        def failed(error):
+            self.end_transfer()
+            msg.showerror("Export Error", str(error))
+
         try:
-            dest = Path.cwd() / f"tegbar_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            dest.write_text(json.dumps(self.tasks_by_date, indent=2, ensure_ascii=False), encoding="utf-8")
-            msg.showinfo("Exported", f"Exported tasks to {dest}")
-        except Exception as e:
-            msg.showerror("Export Error", str(e))
+            self.transfer = tegbar_io.Transfer(self.workers.submit, self.bridge.post, work,
+                                               on_progress=self.show_transfer_progress, on_done=done, on_error=failed)
+        except RuntimeError as e:
+            failed(e)
+
+    def import_tasks(self):
+        # loaded on first use instead of at startup
+        import tegbar_io
+        import tkinter.filedialog as filedialog
+        path = filedialog.askopenfilename(
+            title="Import tasks",
+            filetypes=[("Task files", "*.json *.ndjson *.jsonl *.csv"), ("All files", "*.*")])
+        if not path or not self.start_transfer("Importing..."):
+            return
+        fmt = None
+        try:
+            tegbar_io.format_of(path)
+        except ValueError:
+            fmt = self.transfer_format.get().lower()  # unknown extension: trust the menu
+        fallback_date = self.selected_date.isoformat()
+        added = [0, 0]  # imported, skipped as already present
+
+        def to_task(record):
+            date_key = record["date"]
+            try:
+                datetime.strptime(date_key, "%Y-%m-%d")
+            except ValueError:
+                date_key = fallback_date
+            return date_key, Task(record["id"] or new_task_id(), record["text"], record["time"],
+                                  record["priority"], record["done"], record["notes"], record["created"])
+
+        def work(transfer):
+            records = tegbar_io.read_records(path, fmt, progress=transfer.report)
+            for batch in tegbar_io.batched(records):
+                if transfer.cancelled:
+                    break
+                transfer.emit([to_task(record) for record in batch])
+
+        def add_batch(items):
+            fresh, seen = [], set()
+            for item in items:
+                task_id = item[1].id
+                if task_id not in self.task_index and task_id not in seen:
+                    seen.add(task_id)
+                    fresh.append(item)
+            added[0] += len(fresh)
+            added[1] += len(items) - len(fresh)
+            if fresh:
+                self.add_tasks(fresh)
+
+        def done(_):
+            self.end_transfer()
+            self.draw_tasks()
+            skipped = f" ({added[1]} already present)" if added[1] else ""
+            msg.showinfo("Imported", f"Imported {added[0]} tasks{skipped}.")
+
+        def failed(error):
+            self.end_transfer()
+            self.draw_tasks()
+            msg.showerror("Import Error", f"{error}\n\n{added[0]} tasks were imported before the error.")
+
+        try:
+            self.transfer = tegbar_io.Transfer(self.workers.submit, self.bridge.post, work, on_batch=add_batch,
+                                               on_progress=self.show_transfer_progress, on_done=done, on_error=failed)
+        except RuntimeError as e:
+            failed(e)
+
+    def show_transfer_progress(self, count, fraction):
+        self.transfer_progress.set(fraction)
+        self.transfer_status.configure(text=f"{count:,} tasks")
 
     # ---------- other pages ----------
     def create_team_page(self):
@@ -431,7 +1869,6 @@ class TodoApp(ctk.CTk):
         left = ctk.CTkFrame(page, width=240, corner_radius=8)
         left.pack(side="left", fill="y", padx=12, pady=12)
         ctk.CTkLabel(left, text="Contacts", font=("Arial", 18, "bold")).pack(pady=(12,8))
-        self.team_contacts = list(self.team_messages.keys())
         self.contact_buttons = {}
         for name in self.team_contacts:
             row = ctk.CTkFrame(left, fg_color="transparent")
@@ -454,8 +1891,13 @@ class TodoApp(ctk.CTk):
         self.typing_label = ctk.CTkLabel(header_row, text="", text_color="#666666")
         self.typing_label.pack(side="right")
 
-        self.chat_area = ctk.CTkScrollableFrame(right, corner_radius=6, fg_color="#F7FAFF")
-        self.chat_area.pack(expand=True, fill="both", padx=12, pady=(0,8))
+        # one ChatView per opened conversation, kept when switching contacts
+        self.chat_stack = ctk.CTkFrame(right, fg_color="transparent")
+        self.chat_stack.pack(expand=True, fill="both", padx=12, pady=(0,8))
+        self.chat_placeholder = ctk.CTkLabel(self.chat_stack, text="Pick a contact to start chatting.", fg_color="transparent")
+        self.chat_placeholder.pack(padx=12, pady=12)
+        self.chat_views = {}
+        self.chat_view = None
 
         # multiline input (Shift+Enter = newline, Enter = send)
         input_row = ctk.CTkFrame(right, fg_color="transparent")
@@ -476,28 +1918,58 @@ class TodoApp(ctk.CTk):
     def open_conversation(self, name):
         self.current_chat = name
         self.chat_header.configure(text=name)
-        self.render_team_messages()
-
-    def render_team_messages(self):
-        for w in self.chat_area.winfo_children():
-            w.destroy()
-        if not self.current_chat:
-            ctk.CTkLabel(self.chat_area, text="Pick a contact to start chatting.", fg_color="transparent").pack(padx=12, pady=12)
-            return
-        msgs = self.team_messages.get(self.current_chat, [])
-        for i, m in enumerate(msgs):
-            is_me = (m.get("sender") == "You")
-            bubble = ctk.CTkFrame(self.chat_area, corner_radius=12, fg_color="#D1F7E9" if is_me else "#E8F0FF")
-            # show text and timestamp, name for incoming
-            header_text = ("" if is_me else f"{m.get('sender')} • ") 
-            lbl = ctk.CTkLabel(bubble, text=f"{header_text}{m['text']}\n{m['time']}", wraplength=800, anchor="w")
-            lbl.pack(padx=12, pady=8)
-            bubble.pack(anchor="e" if is_me else "w", pady=6, padx=12)
+        view = self.chat_views.get(name)
+        if view is None:
+            view = self.chat_views[name] = ChatView(self.chat_stack, self.conversation(name),
+                                                    load_older=lambda: self.chat_store.load_older(name))
+        if view is not self.chat_view:
+            (self.chat_view or self.chat_placeholder).pack_forget()
+            view.pack(expand=True, fill="both")
+            self.chat_view = view
+        view.sync()
+
+    @timed()
+    def render_team_messages(self, name=None):
+        # bubbles only for messages the conversation's view hasn't shown yet
+        view = self.chat_views.get(name or self.current_chat)
+        if view is not None:
+            view.sync()
+
+    def start_chat(self):
+        # the session exists right away so messages sent before it connects are queued
+        host, port = tegbar_chat.HOST, None
+        if self.CHAT_SERVER:
+            host, _, port = self.CHAT_SERVER.rpartition(":")
+            host, port = host or tegbar_chat.HOST, int(port)
+        self.chat_session = tegbar_chat.ChatSession(
+            self.CHAT_USER, host, port, on_message=lambda m: self.on_chat_event("message", m),
+            on_status=lambda state: self.on_chat_event("status", state))
+        self.bridge.spawn(self.run_chat())
+
+    async def run_chat(self):
+        # on the bridge's loop, i.e. the Tk thread: the session's callbacks may touch widgets
+        server = None
+        if self.chat_session.port is None:
+            server = tegbar_chat.ChatServer(silent=self.SILENT_CONTACTS)
+            self.chat_session.port = await server.start(self.chat_session.host)
         try:
-            self.chat_area.update_idletasks()
-            self.chat_area.yview_moveto(1.0)
-        except Exception:
-            pass
+            await self.chat_session.run()
+        finally:
+            if server is not None:
+                await server.close()
+
+    def on_chat_event(self, kind, payload):
+        if kind == "message":
+            name = payload["from"]
+            self.add_team_message(name, {"sender": name, "text": payload["text"], "time": payload["time"]})
+            if "team" in self.pages:
+                if name == self.current_chat:
+                    self.typing_label.configure(text="")
+                self.render_team_messages(name)
+        else:
+            self.chat_state = payload
+            if "team" in self.pages:
+                self.typing_label.configure(text="" if payload == "connected" else "Offline, reconnecting...")
 
     def send_team_message(self):
         # support Text widget get range
@@ -508,27 +1980,18 @@ class TodoApp(ctk.CTk):
         if not text or not self.current_chat:
             return
         msg_obj = {"sender":"You", "text":text, "time": datetime.now().strftime("%H:%M")}
-        self.team_messages.setdefault(self.current_chat, []).append(msg_obj)
-        self.save_team_messages()
+        self.add_team_message(self.current_chat, msg_obj)
         # clear textbox
         try:
             self.team_entry.delete("0.0", "end")
         except Exception:
             self.team_entry.delete(0, "end")
         self.render_team_messages()
-        # typing indicator + mock reply
-        if self.current_chat != "Neo":
+        # queued by the client until the server acknowledges it, across reconnects
+        self.chat_session.send(self.current_chat, text, msg_obj["time"])
+        self.bridge.wake()  # the sender coroutine is waiting on that queue
+        if self.chat_state == "connected" and self.current_chat not in self.SILENT_CONTACTS:
             self.typing_label.configure(text=f"{self.current_chat} is typing...")
-            def worker():
-                time.sleep(1.0)
-                def do_reply():
-                    reply = {"sender": self.current_chat, "text": "Acknowledged.", "time": datetime.now().strftime("%H:%M")}
-                    self.team_messages.setdefault(self.current_chat, []).append(reply)
-                    self.save_team_messages()
-                    self.typing_label.configure(text="")
-                    self.render_team_messages()
-                self.chat_area.after(10, do_reply)
-            threading.Thread(target=worker, daemon=True).start()
 
     def create_simple_page(self, title, text):
         page = ctk.CTkFrame(self.container)
@@ -546,8 +2009,25 @@ class TodoApp(ctk.CTk):
         theme_opt.pack(side="left")
         theme_opt.set("System")
         ctk.CTkLabel(page, text="Storage: (auto-saves to your home directory)", text_color="gray").pack(pady=(8, 0))
+        self.storage_stats_label = ctk.CTkLabel(page, text="", text_color="gray")
+        self.storage_stats_label.pack(pady=(4, 0))
         return page
 
+    def draw_storage_stats(self):
+        st = self.saver.stats()
+        text = f"Saves requested: {st['requested']} • written: {st['performed']} • last write: {st['last_latency_ms']} ms"
+        if self.search_pipeline.last_latency is not None:
+            text += f"\nLast search: {self.search_pipeline.last_latency:.1f} ms from keystroke to results"
+        text += f"\nStartup: {self.startup_report()}"
+        loop, pool = self.bridge.stats(), self.workers.stats()
+        text += (f"\nUI queue: {loop['posted']} waiting (max {loop['max_posted']}) • "
+                 f"latency {loop['last_latency_ms']} ms (max {loop['max_latency_ms']} ms)"
+                 f"\nWorkers: {pool['active']}/{pool['workers']} busy • {pool['queued']} queued • "
+                 f"{pool['completed']} done • {pool['rejected']} rejected"
+                 f"\nAsync: {loop['tasks']} tasks pending • {loop['ticks']} ticks • tick {loop['last_tick_ms']} ms "
+                 f"(max {loop['max_tick_ms']} ms)")
+        self.storage_stats_label.configure(text=text)
+
     def create_history_page(self):
         page = ctk.CTkFrame(self.container)
         ctk.CTkLabel(page, text="History", font=("Arial", 24, "bold")).pack(pady=(12,6), anchor="w", padx=12)
@@ -566,6 +2046,23 @@ class TodoApp(ctk.CTk):
         self.history_progress = ctk.CTkProgressBar(page, width=520)
         self.history_progress.pack(pady=(0,12))
 
+        # completion-rate chart
+        chart_header = ctk.CTkFrame(page, fg_color="transparent")
+        chart_header.pack(fill="x", padx=12)
+        self.history_period = ctk.CTkSegmentedButton(chart_header, values=["Day", "Week", "Month"],
+                                                     command=lambda _: self.draw_history_chart())
+        self.history_period.set("Week")
+        self.history_period.pack(side="left")
+        self.history_streak_label = ctk.CTkLabel(chart_header, text="", text_color="gray")
+        self.history_streak_label.pack(side="right")
+        bg = ctk.ThemeManager.theme["CTkFrame"]["fg_color"]
+        self.history_chart = ctk.CTkCanvas(page, height=140, highlightthickness=0,
+                                           bg=bg[0] if ctk.get_appearance_mode() == "Light" else bg[1])
+        self.history_chart.pack(fill="x", padx=12, pady=(6, 0))
+        self.history_chart.bind("<Configure>", lambda e: self.draw_history_chart())
+        self.history_priority_label = ctk.CTkLabel(page, text="", text_color="gray")
+        self.history_priority_label.pack(anchor="w", padx=12)
+
         # recent tasks list
         self.history_list_frame = ctk.CTkFrame(page, corner_radius=6)
         self.history_list_frame.pack(expand=True, fill="both", padx=12, pady=12)
@@ -574,16 +2071,13 @@ class TodoApp(ctk.CTk):
         self.draw_history()
         return page
 
+    @timed()
     def draw_history(self):
-        # compute done / undone counts
-        done = 0
-        undone = 0
-        for task_list in self.tasks_by_date.values():
-            for t in task_list:
-                if t.get("done"):
-                    done += 1
-                else:
-                    undone += 1
+        # counts are maintained by every mutation; nothing to redraw if none happened
+        if self.history_version == self.summary.version:
+            return
+        self.history_version = self.summary.version
+        done, undone = self.summary.done, self.summary.undone
         total = done + undone
         percent = int((done / total) * 100) if total else 0
 
@@ -596,6 +2090,8 @@ class TodoApp(ctk.CTk):
         except Exception:
             pass
 
+        self.draw_history_chart()
+
         # render recent tasks list (most recent first)
         for w in self.history_list_frame.winfo_children():
             w.destroy()
@@ -604,10 +2100,10 @@ class TodoApp(ctk.CTk):
             return
         # show up to 100 items for performance
         items = []
-        for date_str in sorted(self.tasks_by_date.keys(), reverse=True):
-            for t in self.tasks_by_date[date_str]:
-                status = "✓" if t.get("done") else "○"
-                items.append(f"{date_str} {status} {t.get('text')} [{t.get('priority')}]")
+        for date_str in self.summary.recent_dates(100):
+            for t in self.tasks_by_date.get(date_str, []):
+                status = "✓" if t.done else "○"
+                items.append(f"{date_str} {status} {t.text} [{t.priority}]")
                 if len(items) >= 100:
                     break
             if len(items) >= 100:
@@ -615,6 +2111,43 @@ class TodoApp(ctk.CTk):
         for it in items:
             ctk.CTkLabel(self.history_list_frame, text=it, anchor="w").pack(fill="x", padx=8, pady=2)
 
+    CHART_BARS = 30  # most recent periods shown in the History chart
+
+    @timed()
+    def draw_history_chart(self):
+        self.analytics.refresh(self.tasks_by_date)
+        period = self.history_period.get().lower()
+        buckets = self.analytics.rates(period)[-self.CHART_BARS:]
+
+        current, longest = self.analytics.streaks()
+        self.history_streak_label.configure(text=f"Streak: {current} days (best {longest})")
+        rates = []
+        for p, (done, total) in self.analytics.by_priority().items():
+            if total:
+                rates.append(f"{p} {done * 100 // total}%")
+        self.history_priority_label.configure(text="Completed by priority: " + ", ".join(rates) if rates else "")
+
+        canvas = self.history_chart
+        canvas.delete("all")
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if not buckets or width <= 1:
+            return
+        label_h = 16
+        slot = width / self.CHART_BARS
+        fmt = {"day": "%d %b", "week": "%d %b", "month": "%b %Y"}[period]
+        for i, (start, done, total) in enumerate(buckets):
+            x0 = i * slot + 2
+            x1 = (i + 1) * slot - 2
+            y0 = height - label_h
+            canvas.create_rectangle(x0, 4, x1, y0, fill="#e5e7eb", width=0)
+            bar_top = y0 - (y0 - 4) * done / total
+            canvas.create_rectangle(x0, bar_top, x1, y0, fill="#16a34a", width=0)
+        # label the oldest and newest bars
+        for i, anchor in ((0, "w"), (len(buckets) - 1, "e"))[:len(buckets)]:
+            x = i * slot + (2 if anchor == "w" else slot - 2)
+            canvas.create_text(x, height - 2, anchor="s" + anchor, fill="gray", font=("Arial", 9),
+                               text=date.fromordinal(buckets[i][0]).strftime(fmt))
+
     def create_ai_page(self):
         page = ctk.CTkFrame(self.container)
         header = ctk.CTkFrame(page, fg_color="transparent")
@@ -676,15 +2209,14 @@ class TodoApp(ctk.CTk):
             self.ai_entry.delete(0, "end")
         self.render_ai_messages()
 
-        def worker():
-            time.sleep(0.6)
-            reply_text = self.ai_generate_reply(text)
-            self.ai_messages.append({"sender":"Tegbar AI", "text":reply_text, "time": datetime.now().strftime("%H:%M")})
-            try:
-                self.ai_area.after(10, self.render_ai_messages)
-            except Exception:
-                self.render_ai_messages()
-        threading.Thread(target=worker, daemon=True).start()
+        self.bridge.spawn(self.ai_reply(text))
+
+    async def ai_reply(self, text):
+        await asyncio.sleep(self.AI_DELAY_MS / 1000)
+        # on the Tk thread: the reply may add a task
+        reply_text = self.ai_generate_reply(text)
+        self.ai_messages.append({"sender":"Tegbar AI", "text":reply_text, "time": datetime.now().strftime("%H:%M")})
+        self.render_ai_messages()
 
     def ai_generate_reply(self, text):
         t = text.strip()
@@ -696,19 +2228,9 @@ class TodoApp(ctk.CTk):
             time_txt = parts[1] if len(parts) >= 2 else ""
             priority = (parts[2].capitalize() if len(parts) >= 3 and parts[2] else "Normal")
             notes = parts[3] if len(parts) >= 4 else ""
-            date_key = self.selected_date.isoformat()
-            self.tasks_by_date.setdefault(date_key, []).append({
-                "text": title, "time": time_txt, "priority": priority, "done": False, "notes": notes, "created": datetime.now().isoformat()
-            })
-            try:
-                self.save_tasks()
-            except Exception:
-                pass
-            try:
-                if self.pages.get("tasks"):
-                    self.pages["tasks"].after(10, self.draw_tasks)
-            except Exception:
-                pass
+            self.add_task(self.selected_date.isoformat(), Task(new_task_id(), title, time_txt, priority, notes=notes))
+            if self.pages.get("tasks"):
+                self.draw_tasks()
             return f"Added task '{title}' for {self.selected_date.strftime('%Y-%m-%d')} (priority: {priority})."
 
         if "summarize" in lt or ("today" in lt and "task" in lt) or "summary" in lt:
@@ -718,9 +2240,9 @@ class TodoApp(ctk.CTk):
                 return f"No tasks for {self.selected_date.strftime('%Y-%m-%d')}."
             lines = []
             for i, task in enumerate(tasks, 1):
-                mark = "✓" if task.get("done") else "○"
-                time_txt = f" @ {task.get('time')}" if task.get("time") else ""
-                lines.append(f"{i}. {mark} {task.get('text')}{time_txt} [{task.get('priority')}]")
+                mark = "✓" if task.done else "○"
+                time_txt = f" @ {task.time}" if task.time else ""
+                lines.append(f"{i}. {mark} {task.text}{time_txt} [{task.priority}]")
             return "Tasks:\n" + "\n".join(lines)
 
         if "help" in lt or "how" in lt or "tips" in lt:
@@ -737,11 +2259,20 @@ class TodoApp(ctk.CTk):
             ctk.set_appearance_mode("system")
 
     def on_close(self):
-        self.save_tasks()
+        # drain pending background writes, then fold the journal into the
+        # snapshot so the next start replays nothing
+        if self.transfer is not None:
+            self.transfer.cancel()
+        self.bridge.close()  # cancels the chat connection and pending AI replies
+        self.saver.close()
+        if "tasks" in self.loaded and not self.tasks_load_failed:
+            self.save_tasks()
+        self.journal.close()
         self.destroy()
 
 
 if __name__ == "__main__":
-    app = TodoApp()
+    with span("startup: TodoApp()"):
+        app = TodoApp()
 
     app.mainloop()
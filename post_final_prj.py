@@ -3,6 +3,9 @@ from tkinter.font import Font
 from tkinter import colorchooser
 from tkinter import filedialog
 import os
+
+from tegbar_profile import timed
+
 window = Tk()
 window.title("To-Do List")
 window.geometry("500x500")
@@ -77,6 +80,7 @@ btframe = Frame(window,
 btframe.pack(pady=25)
 
 
+@timed()
 def search():
         query = searchbox.get().lower()
         listbox.delete(0, END)
@@ -85,6 +89,7 @@ def search():
                 listbox.insert(END, item)
 
 
+@timed()
 def add_():
         text = entry.get().strip()
         if text:
@@ -107,6 +112,7 @@ def cross_off_():
         fg="#dedede",)
     listbox.selection_clear(0,END)
 
+@timed()
 def delete_crossed_():
     count = 0
     while count < listbox.size():
@@ -117,6 +123,7 @@ def delete_crossed_():
         
     from tkinter import filedialog
 
+@timed()
 def save_list():
     filepath = filedialog.asksaveasfilename(
         defaultextension=".txt",
@@ -130,6 +137,7 @@ def save_list():
                 file.write(item + "\n")
 
 
+@timed()
 def open_list():
     listbox.delete(0, END)
     if os.path.exists("todo.txt"):
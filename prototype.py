@@ -1,6 +1,8 @@
 import customtkinter as ctk
 from datetime import datetime, timedelta
 
+from tegbar_profile import span, timed
+
 ctk.set_appearance_mode("light")
 ctk.set_default_color_theme("blue")
 
@@ -53,10 +55,12 @@ class TodoApp(ctk.CTk):
         self.show_page("tasks")
 
     # ================= SIDEBAR PAGE SWITCH =================
+    @timed()
     def show_page(self, name):
         self.pages[name].tkraise()
 
     # ================= TASK PAGE =================
+    @timed()
     def create_tasks_page(self):
         page = ctk.CTkFrame(self.container)
 
@@ -83,6 +87,7 @@ class TodoApp(ctk.CTk):
         return page
 
     # ================= DATE BUTTONS =================
+    @timed()
     def draw_days(self):
         for w in self.days_frame.winfo_children():
             w.destroy()
@@ -115,6 +120,7 @@ class TodoApp(ctk.CTk):
                 btn.configure(fg_color="transparent", text_color="black")
 
     # ================= TASK LIST =================
+    @timed()
     def draw_tasks(self):
         for w in self.task_frame.winfo_children():
             w.destroy()
@@ -180,6 +186,7 @@ class TodoApp(ctk.CTk):
 
         ctk.CTkButton(self.popup, text="Save", command=self.save_task).pack(pady=20)
 
+    @timed()
     def save_task(self):
         text = self.task_input.get().strip()
         if not text:
@@ -220,5 +227,6 @@ class TodoApp(ctk.CTk):
 
 
 if __name__ == "__main__":
-    app = TodoApp()
+    with span("startup: TodoApp()"):
+        app = TodoApp()
     app.mainloop()
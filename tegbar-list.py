@@ -1,25 +1,32 @@
+import asyncio
+import concurrent.futures
 import sqlite3
 import hashlib
+import re
+import sys
 import customtkinter as ctk
-from tkinter import messagebox, Listbox, Frame, Button
+from tkinter import messagebox, filedialog, Listbox, Frame, Button
 from datetime import datetime
 import threading
 import time
+from collections import deque
+from contextlib import contextmanager
+import tegbar_io
+from tegbar_async import AsyncBridge
+from tegbar_profile import record, timed
 
-# ---------------------- DB SETUP ----------------------
-def init_db():
-    conn = sqlite3.connect("users.db")
-    cursor = conn.cursor()
-    cursor.execute("""
+# ---------------------- SCHEMA MIGRATIONS ----------------------
+def _migration_1_base_tables(conn):
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS users (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             username TEXT UNIQUE NOT NULL,
             password TEXT NOT NULL
         )
     """)
-    
+
     # Create tasks table for data persistence
-    cursor.execute("""
+    conn.execute("""
         CREATE TABLE IF NOT EXISTS tasks (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER,
@@ -29,25 +36,342 @@ def init_db():
             FOREIGN KEY (user_id) REFERENCES users (id)
         )
     """)
-    conn.commit()
-    conn.close()
+
+def _migration_2_task_indexes(conn):
+    # Covers the per-user, per-status listing (filter, order and every selected
+    # column), so those queries never touch the table itself.
+    conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_tasks_user_status_time
+        ON tasks (user_id, status, timestamp DESC, id DESC, task_text)
+    """)
+
+def _migration_3_task_search(conn):
+    # Full-text index over task_text, stored as an external-content table so
+    # the text is not duplicated; the triggers keep it in step with tasks.
+    try:
+        conn.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts
+            USING fts5(task_text, content='tasks', content_rowid='id')
+        """)
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5; search_tasks falls back to LIKE and the
+        # step is retried on the next start, e.g. after SQLite is upgraded
+        return False
+    # one execute() per trigger: executescript() would COMMIT migrate()'s transaction
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_insert AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts (rowid, task_text) VALUES (new.id, new.task_text);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_delete AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, task_text) VALUES ('delete', old.id, old.task_text);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_update AFTER UPDATE OF task_text ON tasks BEGIN
+            INSERT INTO tasks_fts (tasks_fts, rowid, task_text) VALUES ('delete', old.id, old.task_text);
+            INSERT INTO tasks_fts (rowid, task_text) VALUES (new.id, new.task_text);
+        END
+    """)
+    conn.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+
+# Applied in order; a database at version N has run the first N steps.
+MIGRATIONS = [
+    _migration_1_base_tables,
+    _migration_2_task_indexes,
+    _migration_3_task_search,
+]
+
+# ---------------------- DATA ACCESS ----------------------
+class Database:
+    """Single long-lived connection to users.db used by every screen.
+
+    sqlite3 keeps a cache of prepared statements per connection, so reusing
+    one connection means the fixed SQL below is parsed once, not per click.
+    Each write runs in its own transaction via `with self.transaction()`.
+    """
+    def __init__(self, path="users.db"):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._has_fts = None
+
+    @contextmanager
+    def transaction(self):
+        """Commit on success, roll back on error."""
+        with self.lock, self.conn:
+            yield self.conn
+
+    def query(self, sql, params=()):
+        with self.lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    # --- schema ---
+    @timed()
+    def migrate(self):
+        """Bring the schema up to len(MIGRATIONS), one transaction per step.
+
+        The applied version is kept in PRAGMA user_version, so existing
+        users.db files upgrade in place and each step runs exactly once. A
+        step that returns False couldn't run here: the version stays below it
+        and the remaining steps wait for the next start.
+        """
+        with self.lock:
+            version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+            for target, step in enumerate(MIGRATIONS[version:], start=version + 1):
+                self.conn.execute("BEGIN")
+                try:
+                    if step(self.conn) is False:
+                        self.conn.rollback()
+                        break
+                    self.conn.execute(f"PRAGMA user_version = {target}")
+                    self.conn.commit()
+                except Exception:
+                    self.conn.rollback()
+                    raise
+            if version >= 3 and not self.has_fts():
+                # marked done by builds that bumped the version without FTS5
+                with self.conn:
+                    _migration_3_task_search(self.conn)
+                self._has_fts = None
+
+    # --- users ---
+    @timed()
+    def find_user(self, username, password_hash):
+        rows = self.query("SELECT id FROM users WHERE username=? AND password=?", (username, password_hash))
+        return rows[0][0] if rows else None
+
+    def create_user(self, username, password_hash):
+        """Raises sqlite3.IntegrityError if the username is taken."""
+        with self.transaction() as conn:
+            conn.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, password_hash))
+
+    # --- tasks ---
+    # Rows are (id, task_text, timestamp); mutations address tasks by id.
+    @timed()
+    def list_tasks(self, user_id, status, limit=-1, after=None):
+        """Newest tasks first, at most limit rows (-1: all).
+
+        after is the (timestamp, id) of the last row already shown; the next
+        page starts right below it (keyset pagination), so fetching page N
+        costs the same as page 1.
+        """
+        if after is None:
+            return self.query("""
+                SELECT id, task_text, timestamp FROM tasks
+                WHERE user_id=? AND status=?
+                ORDER BY timestamp DESC, id DESC
+                LIMIT ?
+            """, (user_id, status, limit))
+        return self.query("""
+            SELECT id, task_text, timestamp FROM tasks
+            WHERE user_id=? AND status=? AND (timestamp, id) < (?, ?)
+            ORDER BY timestamp DESC, id DESC
+            LIMIT ?
+        """, (user_id, status, after[0], after[1], limit))
+
+    def iter_tasks(self, user_id, status, page_size=1000):
+        """Every task of a status, newest first, fetched a page at a time"""
+        after = None
+        while True:
+            page = self.list_tasks(user_id, status, page_size, after)
+            yield from page
+            if len(page) < page_size:
+                return
+            after = (page[-1][2], page[-1][0])
+
+    def has_fts(self):
+        if self._has_fts is None:
+            self._has_fts = bool(self.query(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='tasks_fts'"))
+        return self._has_fts
+
+    @staticmethod
+    def fts_query(text):
+        """Every word of text as a quoted prefix term, e.g. 'buy mi' -> '"buy"* "mi"*'."""
+        words = re.findall(r"\w+", text)
+        return " ".join('"' + w.replace('"', '""') + '"*' for w in words)
+
+    @timed()
+    def search_tasks(self, user_id, status, query):
+        """Tasks containing words that start with each word of query."""
+        match = self.fts_query(query)
+        if not match or not self.has_fts():
+            return self.query("""
+                SELECT id, task_text, timestamp FROM tasks
+                WHERE user_id=? AND status=? AND task_text LIKE ?
+                ORDER BY timestamp DESC, id DESC
+            """, (user_id, status, f"%{query}%"))
+        # CROSS JOIN pins the join order: run the MATCH first, then look the few
+        # hits up by primary key (otherwise SQLite re-runs MATCH per task row).
+        return self.query("""
+            SELECT t.id, t.task_text, t.timestamp
+            FROM tasks_fts CROSS JOIN tasks t ON t.id = tasks_fts.rowid
+            WHERE tasks_fts MATCH ? AND t.user_id=? AND t.status=?
+            ORDER BY t.timestamp DESC, t.id DESC
+        """, (match, user_id, status))
+
+    @timed()
+    def add_task(self, user_id, task_text, timestamp):
+        """Insert an ongoing task and return its id."""
+        with self.transaction() as conn:
+            cursor = conn.execute("""
+                INSERT INTO tasks (user_id, task_text, timestamp, status)
+                VALUES (?, ?, ?, 'ongoing')
+            """, (user_id, task_text, timestamp))
+            return cursor.lastrowid
+
+    @timed()
+    def set_status(self, user_id, task_id, status):
+        with self.transaction() as conn:
+            conn.execute("UPDATE tasks SET status=? WHERE id=? AND user_id=?", (status, task_id, user_id))
+
+    @timed()
+    def delete_task(self, user_id, task_id):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM tasks WHERE id=? AND user_id=?", (task_id, user_id))
+
+    @timed()
+    def delete_by_status(self, user_id, status):
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM tasks WHERE user_id=? AND status=?", (user_id, status))
+
+    # --- batches: one executemany, one transaction, however many rows ---
+    @timed()
+    def bulk_insert(self, user_id, tasks, status="ongoing"):
+        """Insert (task_text, timestamp) pairs; returns their ids in order."""
+        tasks = list(tasks)
+        with self.transaction() as conn:
+            conn.executemany("""
+                INSERT INTO tasks (user_id, task_text, timestamp, status)
+                VALUES (?, ?, ?, ?)
+            """, [(user_id, text, timestamp, status) for text, timestamp in tasks])
+            if not tasks:
+                return []
+            # AUTOINCREMENT hands out consecutive ids within one transaction
+            last = conn.execute("SELECT seq FROM sqlite_sequence WHERE name='tasks'").fetchone()[0]
+        return list(range(last - len(tasks) + 1, last + 1))
+
+    @timed()
+    def move_many(self, user_id, task_ids, status):
+        with self.transaction() as conn:
+            conn.executemany("UPDATE tasks SET status=? WHERE id=? AND user_id=?",
+                             [(status, task_id, user_id) for task_id in task_ids])
+
+    def complete_many(self, user_id, task_ids):
+        self.move_many(user_id, task_ids, "achieved")
+
+    @timed()
+    def delete_many(self, user_id, task_ids):
+        with self.transaction() as conn:
+            conn.executemany("DELETE FROM tasks WHERE id=? AND user_id=?",
+                             [(task_id, user_id) for task_id in task_ids])
+
+
+_db = None
+
+def get_db():
+    """Shared Database, opened on first use."""
+    global _db
+    if _db is None:
+        _db = Database("users.db")
+    return _db
+
+class DbWriter:
+    """Runs database writes in order on one worker thread.
+
+    The UI patches its own model first and queues the write. Writes go to a
+    single-thread executor through the window's AsyncBridge, so they land in
+    the order they were queued and their callbacks come back on the Tk
+    thread like any other background result. Reads that must see those
+    writes are awaited with run(), which queues them behind the writes
+    instead of blocking the Tk thread until the queue is empty. A task added
+    from the UI gets a temporary negative id until its INSERT has run;
+    resolve() maps it to the real id for every write queued behind it.
+    """
+    def __init__(self, bridge):
+        self.bridge = bridge
+        self.executor = concurrent.futures.ThreadPoolExecutor(1, thread_name_prefix="tegbar-db")
+        self.id_map = {}  # temporary id -> real id, filled in by the worker
+        self.submitted = 0  # writes queued so far
+        self._last_temp_id = 0
+
+    def temp_id(self):
+        self._last_temp_id -= 1
+        return self._last_temp_id
+
+    def resolve(self, task_id):
+        return self.id_map.get(task_id, task_id)
+
+    def submit(self, job, on_done=None, on_error=None):
+        self.submitted += 1
+        return self.bridge.submit(job, on_done=on_done, on_error=on_error, executor=self.executor)
+
+    async def run(self, fn, *args):
+        """Await fn(*args) on the writer thread, after every write queued before it"""
+        return await self.bridge.run_in_thread(fn, *args, executor=self.executor)
+
+    def close(self):
+        self.executor.shutdown()
+
+# ---------------------- DB SETUP ----------------------
+def init_db():
+    get_db().migrate()
 
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
 # ---------------------- ANIMATED NOTIFICATION SYSTEM ----------------------
 class AnimatedNotification:
-    def __init__(self, parent):
+    """Toasts that slide in at the top-right, one at a time.
+
+    One coroutine on the window's AsyncBridge shows them in turn: it slides
+    a toast in, waits, slides it out and moves on to the next, so the event
+    loop keeps handling input while a toast moves. Notifications raised
+    while one is on screen wait in a queue; a waiting queue shortens the
+    display time so a burst of messages drains quickly.
+    """
+    FPS = 60
+    SLIDE_MS = 200  # duration of the slide in / out
+    SHOW_MS = 4000  # time on screen with nothing queued behind it
+    SHOW_QUEUED_MS = 1500  # time on screen when more toasts are waiting
+    HIDDEN_Y = -100
+    SHOWN_Y = 20
+
+    def __init__(self, parent, bridge):
         self.parent = parent
+        self.bridge = bridge
         self.notification = None
-        self.animation_thread = None
-        
+        self.queue = deque()
+        self.runner = None  # task showing the queue, while there is one
+
     def show_notification(self, message, notification_type="success"):
-        """Show animated notification"""
-        # Destroy existing notification if any
-        if self.notification:
-            self.notification.destroy()
-            
+        """Show animated notification (queued behind the current one)"""
+        self.queue.append((message, notification_type))
+        if self.runner is None or self.runner.done():
+            self.runner = self.bridge.spawn(self.show_queued())
+
+    async def show_queued(self):
+        while self.queue:
+            message, notification_type = self.queue.popleft()
+            self.build(message, notification_type)
+            try:
+                await self.slide(self.HIDDEN_Y, self.SHOWN_Y)
+                await asyncio.sleep((self.SHOW_QUEUED_MS if self.queue else self.SHOW_MS) / 1000)
+                await self.slide(self.SHOWN_Y, self.HIDDEN_Y)
+            finally:
+                if self.notification.winfo_exists():
+                    self.notification.destroy()
+                self.notification = None
+
+    def build(self, message, notification_type):
         # Create notification frame
         self.notification = ctk.CTkFrame(self.parent, fg_color="#2b2b2b", corner_radius=10)
         
@@ -73,57 +397,182 @@ class AnimatedNotification:
         message_label = ctk.CTkLabel(self.notification, text=message, font=("Arial", 14), 
                                    text_color="white", fg_color="transparent")
         message_label.pack(side="left", padx=(0, 15), pady=15)
-        
-        # Position notification (top-right corner)
-        self.notification.place(relx=1.0, rely=0.0, x=-143, y=20, anchor="center")
-        
-        # Start animation
-        self.animate_in()
-        
-        # Auto-hide after 4 seconds
-        self.parent.after(4000, self.animate_out)
-        
-    def animate_in(self):
-        """Animate notification sliding in from top"""
-        if not self.notification:
-            return
-    
-        # Start position (above screen)
-        self.notification.place(relx=0.2, rely=0.0, x=-143, y=-100, anchor="ne")
-        
-        # Animate to final position
-        for i in range(20):
-            if not self.notification:
-                break
-            y_pos = -100 + (i * 6)  # Smooth slide down
+
+    async def slide(self, from_y, to_y):
+        # Frames are placed by elapsed time, so a slow frame skips ahead
+        # instead of stretching the animation.
+        start = time.perf_counter()
+        while self.notification.winfo_exists():
+            t = min(1.0, (time.perf_counter() - start) * 1000 / self.SLIDE_MS)
+            eased = 1 - (1 - t) ** 3  # ease-out cubic
+            y_pos = round(from_y + (to_y - from_y) * eased)
             self.notification.place(relx=1.0, rely=0.0, x=-143, y=y_pos, anchor="ne")
-            self.parent.update()
-            time.sleep(0.01)
-            
-    def animate_out(self):
-        """Animate notification sliding out"""
-        if not self.notification:
+            if t >= 1.0:
+                return
+            await asyncio.sleep(1 / self.FPS)
+
+# ---------------------- TASK ROWS ----------------------
+class TaskRow:
+    """One task row (frame, title, timestamp), used by both tabs"""
+    def __init__(self, master):
+        self.task_id = None
+        self.frame = ctk.CTkFrame(master, fg_color=TaskRowPool.ROW_COLOR, corner_radius=8)
+
+        # Create inner frame to hold content
+        content_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        content_frame.pack(fill="x", padx=10, pady=8)
+
+        # Task text (bold, left side)
+        self.task_label = ctk.CTkLabel(content_frame, text="", font=("Arial", 14, "bold"),
+                                       anchor="w", fg_color="transparent")
+        self.task_label.pack(side="left", fill="x", expand=True)
+
+        # Timestamp (faded, right side)
+        self.timestamp_label = ctk.CTkLabel(content_frame, text="", font=("Consolas", 12),
+                                            anchor="e", text_color="#888888", fg_color="transparent")
+        self.timestamp_label.pack(side="right", padx=(10, 0))
+
+    def show(self, task, achieved):
+        self.task_id, task_text, timestamp = task
+
+        # Convert timestamp to readable format for display
+        try:
+            dt = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+            display_timestamp = dt.strftime("%d %b %H:%M")
+        except ValueError:
+            display_timestamp = timestamp
+
+        # Achieved tasks are green with a check mark
+        if achieved:
+            self.task_label.configure(text=f"{task_text} ✅", text_color="#4CAF50")
+        else:
+            self.task_label.configure(text=task_text, text_color="#fff")
+        self.timestamp_label.configure(text=display_timestamp)
+
+
+class TaskRowPool:
+    """Creates, recycles and handles events for the rows of one list.
+
+    Released rows are unpacked and kept for reuse instead of destroyed.
+    Every widget inside a row carries the pool's bind tag, so one set of
+    <Enter>/<Leave>/<Button-1> handlers serves all rows; the handler finds
+    the row from the event widget's path. A click selects just that row,
+    Ctrl-click adds it to or drops it from the selection.
+    """
+    ROW_COLOR = "#313131"
+    HOVER_COLOR = "#444"
+    SELECTED_COLOR = "#2e4a33"
+    MAX_SPARE = 100  # released rows kept around for reuse
+
+    def __init__(self, master, on_click, achieved=False):
+        self.master = master
+        self.on_click = on_click  # called with the clicked row's task id
+        self.achieved = achieved
+        self.rows_by_path = {}  # Tk path of a row frame -> TaskRow
+        self.spare = []
+        self.hovered = None
+        self.selected = set()  # TaskRows, so a swapped task id stays selected
+        self.tag = f"TaskRowPool{id(self)}"
+        master.bind_class(self.tag, "<Enter>", self.on_enter)
+        master.bind_class(self.tag, "<Leave>", self.on_leave)
+        master.bind_class(self.tag, "<Button-1>", self.on_button)
+        master.bind_class(self.tag, "<Control-Button-1>", self.on_control_button)
+
+    def acquire(self, task):
+        """A row showing task, not yet packed"""
+        if self.spare:
+            row = self.spare.pop()
+        else:
+            row = TaskRow(self.master)
+            self.rows_by_path[str(row.frame)] = row
+            self.add_tag(row.frame)
+        row.show(task, self.achieved)
+        return row
+
+    def release(self, row):
+        row.frame.pack_forget()
+        row.task_id = None
+        self.selected.discard(row)
+        if row is self.hovered:
+            self.set_hover(None)
+        if len(self.spare) < self.MAX_SPARE:
+            self.paint(row)
+            self.spare.append(row)
+        else:
+            del self.rows_by_path[str(row.frame)]
+            row.frame.destroy()
+
+    def add_tag(self, widget):
+        # covers the CTk internals (canvases, tk labels) that receive the events
+        widget.bindtags((self.tag,) + widget.bindtags())
+        for child in widget.winfo_children():
+            self.add_tag(child)
+
+    def row_at(self, widget):
+        path = str(widget)
+        while path:
+            row = self.rows_by_path.get(path)
+            if row is not None:
+                return row
+            path = path.rpartition(".")[0]
+        return None
+
+    def selected_ids(self):
+        return [row.task_id for row in self.selected]
+
+    def paint(self, row):
+        if row is self.hovered:
+            color = self.HOVER_COLOR
+        elif row in self.selected:
+            color = self.SELECTED_COLOR
+        else:
+            color = self.ROW_COLOR
+        row.frame.configure(fg_color=color)
+
+    def set_selected(self, rows):
+        changed = self.selected.symmetric_difference(rows)
+        self.selected = set(rows)
+        for row in changed:
+            self.paint(row)
+
+    def set_hover(self, row):
+        if row is self.hovered:
             return
-            
-        # Animate out
-        for i in range(20):
-            if not self.notification:
-                break
-            y_pos = 20 - (i * 6)  # Smooth slide up
-            self.notification.place(relx=1.0, rely=0.0, x=-143, y=y_pos, anchor="ne")
-            self.parent.update()
-            time.sleep(0.01)
-            
-        # Destroy notification
-        if self.notification:
-            self.notification.destroy()
-            self.notification = None
+        previous, self.hovered = self.hovered, row
+        if previous is not None and previous.task_id is not None:
+            self.paint(previous)
+        if row is not None:
+            self.paint(row)
+
+    def on_enter(self, event):
+        self.set_hover(self.row_at(event.widget))
+
+    def on_leave(self, event):
+        # moving between widgets of the same row is not leaving it
+        inside = event.widget.winfo_containing(event.x_root, event.y_root)
+        self.set_hover(self.row_at(inside) if inside is not None else None)
+
+    def on_button(self, event):
+        row = self.row_at(event.widget)
+        if row is not None and row.task_id is not None:
+            self.set_selected({row})
+            self.on_click(row.task_id)
+
+    def on_control_button(self, event):
+        row = self.row_at(event.widget)
+        if row is not None and row.task_id is not None:
+            self.set_selected(self.selected ^ {row})
+            if self.selected:
+                self.on_click(row.task_id)
 
 # ---------------------- TODO APP ----------------------
 def show_todo_app(user_id):
+    started = time.perf_counter()
     ctk.set_appearance_mode("System")
     ctk.set_default_color_theme("green")
 
+    db = get_db()
+
     window = ctk.CTk()
     window.title("ተግባር List")
     window.geometry("400x600")
@@ -131,7 +580,8 @@ def show_todo_app(user_id):
     window.resizable(True, True)  # Allow window resizing
 
     # Create notification system
-    notification = AnimatedNotification(window)
+    bridge = AsyncBridge(window)
+    notification = AnimatedNotification(window, bridge)
     
     # Create main phone frame to contain all widgets
     phone_frame = ctk.CTkFrame(window, fg_color="transparent", corner_radius=15, width=480, height=500)
@@ -156,144 +606,97 @@ def show_todo_app(user_id):
     achieved_scroll.pack(padx=5, pady=5, fill="both", expand=True)
 
     # Global variables to store task data
-    ongoing_tasks = []
-    achieved_tasks = []
-    selected_index = None
-    selected_achieved_index = None
-
-    # Helper to render tasks
-    def render_ongoing_tasks(tasks):
-        nonlocal ongoing_tasks
-        ongoing_tasks = tasks
-        
-        # Clear existing widgets
-        for widget in ongoing_scroll.winfo_children():
-            widget.destroy()
-            
-        for idx, (task_text, timestamp) in enumerate(tasks):
-            # Create main row frame
-            row = ctk.CTkFrame(ongoing_scroll, fg_color="#313131", corner_radius=8)
-            row.pack(fill="x", pady=3, padx=5)
-            
-            # Convert timestamp to readable format for display
-            try:
-                dt = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-                display_timestamp = dt.strftime("%d %b %H:%M")
-            except:
-                display_timestamp = timestamp
-            
-            # Create inner frame to hold content
-            content_frame = ctk.CTkFrame(row, fg_color="transparent")
-            content_frame.pack(fill="x", padx=10, pady=8)
-            
-            # Task text (bold, left side)
-            task_label = ctk.CTkLabel(content_frame, text=task_text, font=("Arial", 14, "bold"), 
-                                     anchor="w", text_color="#fff", fg_color="transparent")
-            task_label.pack(side="left", fill="x", expand=True)
-            
-            # Timestamp (faded, right side)
-            timestamp_label = ctk.CTkLabel(content_frame, text=display_timestamp, font=("Consolas", 12), 
-                                         anchor="e", text_color="#888888", fg_color="transparent")
-            timestamp_label.pack(side="right", padx=(10, 0))
-            
-            # Hover effects
-            def on_enter(e, r=row): 
-                r.configure(fg_color="#444")
-            def on_leave(e, r=row): 
-                r.configure(fg_color="#313131")
-            
-            # Click handler - show popup with action buttons
-            def on_click(e, i=idx): 
-                print(f"Task {i} clicked!")  # Debug message
-                print(f"Calling show_action_popup_for_index({i})")
-                show_action_popup_for_index(i)
-                print(f"Finished calling show_action_popup_for_index({i})")
-            
-            # Bind events to the entire row
-            row.bind("<Enter>", on_enter)
-            row.bind("<Leave>", on_leave)
-            row.bind("<Button-1>", on_click)
-            
-            # Bind events to content frame
-            content_frame.bind("<Enter>", on_enter)
-            content_frame.bind("<Leave>", on_leave)
-            content_frame.bind("<Button-1>", on_click)
-            
-            # Bind events to labels
-            task_label.bind("<Enter>", on_enter)
-            task_label.bind("<Leave>", on_leave)
-            task_label.bind("<Button-1>", on_click)
-            
-            timestamp_label.bind("<Enter>", on_enter)
-            timestamp_label.bind("<Leave>", on_leave)
-            timestamp_label.bind("<Button-1>", on_click)
-
-    # Helper to render achieved tasks
-    def render_achieved_tasks(tasks):
-        nonlocal achieved_tasks
-        achieved_tasks = tasks
-        
-        # Clear existing widgets
-        for widget in achieved_scroll.winfo_children():
-            widget.destroy()
-            
-        for idx, (task_text, timestamp) in enumerate(tasks):
-            # Create main row frame
-            row = ctk.CTkFrame(achieved_scroll, fg_color="#313131", corner_radius=8)
-            row.pack(fill="x", pady=3, padx=5)
-            
-            # Convert timestamp to readable format for display
-            try:
-                dt = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-                display_timestamp = dt.strftime("%d %b %H:%M")
-            except:
-                display_timestamp = timestamp
-            
-            # Create inner frame to hold content
-            content_frame = ctk.CTkFrame(row, fg_color="transparent")
-            content_frame.pack(fill="x", padx=10, pady=8)
-            
-            # Task text (bold, left side) with green color for achieved tasks
-            task_label = ctk.CTkLabel(content_frame, text=f"{task_text} ✅", font=("Arial", 14, "bold"), 
-                                     anchor="w", text_color="#4CAF50", fg_color="transparent")
-            task_label.pack(side="left", fill="x", expand=True)
-            
-            # Timestamp (faded, right side)
-            timestamp_label = ctk.CTkLabel(content_frame, text=display_timestamp, font=("Consolas", 12), 
-                                         anchor="e", text_color="#888888", fg_color="transparent")
-            timestamp_label.pack(side="right", padx=(10, 0))
-            
-            # Hover effects
-            def on_enter(e, r=row): 
-                r.configure(fg_color="#444")
-            def on_leave(e, r=row): 
-                r.configure(fg_color="#313131")
-            
-            # Click handler - show popup with action buttons for achieved tasks
-            def on_click(e, i=idx): 
-                print(f"Achieved task {i} clicked!")  # Debug message
-                print(f"Calling show_achieved_action_popup_for_index({i})")
-                show_achieved_action_popup_for_index(i)
-                print(f"Finished calling show_achieved_action_popup_for_index({i})")
-            
-            # Bind events to the entire row
-            row.bind("<Enter>", on_enter)
-            row.bind("<Leave>", on_leave)
-            row.bind("<Button-1>", on_click)
-            
-            # Bind events to content frame
-            content_frame.bind("<Enter>", on_enter)
-            content_frame.bind("<Leave>", on_leave)
-            content_frame.bind("<Button-1>", on_click)
-            
-            # Bind events to labels
-            task_label.bind("<Enter>", on_enter)
-            task_label.bind("<Leave>", on_leave)
-            task_label.bind("<Button-1>", on_click)
-            
-            timestamp_label.bind("<Enter>", on_enter)
-            timestamp_label.bind("<Leave>", on_leave)
-            timestamp_label.bind("<Button-1>", on_click)
+    PAGE_SIZE = 50  # rows fetched per tab at a time
+    # In-memory model of what each tab shows: (id, task_text, timestamp) rows,
+    # newest first, and the TaskRow of each id. Mutations patch these and
+    # queue the database write instead of reloading both tabs.
+    task_rows = {"ongoing": [], "achieved": []}
+    row_widgets = {"ongoing": {}, "achieved": {}}
+    selected_id = None
+    selected_achieved_id = None
+    has_more = {"ongoing": False, "achieved": False}  # more rows in the DB than on screen
+    load_pending = {"ongoing": False, "achieved": False}
+    search_active = False  # search results are complete, nothing to page in
+    view_generation = 0  # bumped by every reload and search; older reads are dropped
+    writer = DbWriter(bridge)
+
+    # One row factory per tab; clicks come back with the task id
+    row_pools = {
+        "ongoing": TaskRowPool(ongoing_scroll, lambda task_id: show_action_popup_for_id(task_id)),
+        "achieved": TaskRowPool(achieved_scroll, lambda task_id: show_achieved_action_popup_for_id(task_id),
+                                achieved=True),
+    }
+
+    # Helper to render tasks (append=True adds a page below the current rows)
+    @timed()
+    def render_tasks(status, tasks, append=False):
+        rows, widgets, pool = task_rows[status], row_widgets[status], row_pools[status]
+        if not append:
+            rows.clear()
+            # Hand the existing rows back to the pool
+            for row in widgets.values():
+                pool.release(row)
+            widgets.clear()
+        for task in tasks:
+            rows.append(task)
+            row = pool.acquire(task)
+            row.frame.pack(fill="x", pady=3, padx=5)
+            widgets[task[0]] = row
+
+    def render_ongoing_tasks(tasks, append=False):
+        render_tasks("ongoing", tasks, append)
+
+    def render_achieved_tasks(tasks, append=False):
+        render_tasks("achieved", tasks, append)
+
+    # Incremental patches of one row
+    @timed()
+    def insert_row(status, task):
+        """Show task at its sorted place in a tab (if that place is loaded)"""
+        rows, widgets = task_rows[status], row_widgets[status]
+        key = (task[2], task[0])
+        pos = 0
+        while pos < len(rows) and (rows[pos][2], rows[pos][0]) > key:
+            pos += 1
+        if pos == len(rows) and has_more[status]:
+            return  # it sorts into a page that hasn't been loaded yet
+        rows.insert(pos, task)
+        row = row_pools[status].acquire(task)
+        if pos + 1 < len(rows):
+            row.frame.pack(fill="x", pady=3, padx=5, before=widgets[rows[pos + 1][0]].frame)
+        else:
+            row.frame.pack(fill="x", pady=3, padx=5)
+        widgets[task[0]] = row
+
+    @timed()
+    def remove_row(status, task_id):
+        """Drop a task from a tab; returns its (id, text, timestamp) row"""
+        rows = task_rows[status]
+        for pos, task in enumerate(rows):
+            if task[0] == task_id:
+                del rows[pos]
+                row_pools[status].release(row_widgets[status].pop(task_id))
+                return task
+        return None
+
+    def swap_id(temp_id, real_id):
+        """Replace the temporary id of a freshly added task once it is stored"""
+        nonlocal selected_id, selected_achieved_id
+        for status, rows in task_rows.items():
+            for pos, task in enumerate(rows):
+                if task[0] == temp_id:
+                    rows[pos] = (real_id,) + task[1:]
+                    row = row_widgets[status].pop(temp_id)
+                    row.task_id = real_id
+                    row_widgets[status][real_id] = row
+        if selected_id == temp_id:
+            selected_id = real_id
+        if selected_achieved_id == temp_id:
+            selected_achieved_id = real_id
+
+    def on_write_error(error):
+        notification.show_notification(f"Could not save change: {error}", "error")
+        load_tasks()  # resync the view with what is really stored
 
     # Safe auto-hide function to prevent Tkinter errors
     def safe_hide_popup(popup_widget):
@@ -303,12 +706,12 @@ def show_todo_app(user_id):
         except Exception as e:
             print(f"Error hiding popup: {e}")
 
-    # Helper to show popup for a given index - SIMPLIFIED
-    def show_action_popup_for_index(idx):
-        nonlocal selected_index
-        selected_index = idx
+    # Helper to show popup for a given task - SIMPLIFIED
+    def show_action_popup_for_id(task_id):
+        nonlocal selected_id
+        selected_id = task_id
         try:
-            print(f"Showing popup for task {idx}")
+            print(f"Showing popup for task {task_id}")
             
             # Simple fixed positioning - show popup in top-right area
             popup_x = 250  # Adjusted for mobile width (400px - 120px popup - 30px margin)
@@ -318,7 +721,7 @@ def show_todo_app(user_id):
             action_popup.place(x=popup_x, y=popup_y)
             action_popup.lift()
             action_popup.update()  # Force update
-            print(f"Popup shown for task {idx} at position ({popup_x}, {popup_y})")
+            print(f"Popup shown for task {task_id} at position ({popup_x}, {popup_y})")
             
             # Auto-hide popup after 15 seconds with safe function
             window.after(15000, lambda: safe_hide_popup(action_popup))
@@ -329,11 +732,11 @@ def show_todo_app(user_id):
             traceback.print_exc()
 
     # Helper to show popup for achieved tasks
-    def show_achieved_action_popup_for_index(idx):
-        nonlocal selected_achieved_index
-        selected_achieved_index = idx
+    def show_achieved_action_popup_for_id(task_id):
+        nonlocal selected_achieved_id
+        selected_achieved_id = task_id
         try:
-            print(f"Showing achieved popup for task {idx}")
+            print(f"Showing achieved popup for task {task_id}")
             
             # Simple fixed positioning - show popup in top-right area
             popup_x = 250  # Adjusted for mobile width (400px - 120px popup - 30px margin)
@@ -343,7 +746,7 @@ def show_todo_app(user_id):
             achieved_action_popup.place(x=popup_x, y=popup_y)
             achieved_action_popup.lift()
             achieved_action_popup.update()  # Force update
-            print(f"Achieved popup shown for task {idx} at position ({popup_x}, {popup_y})")
+            print(f"Achieved popup shown for task {task_id} at position ({popup_x}, {popup_y})")
             
             # Auto-hide popup after 15 seconds with safe function
             window.after(15000, lambda: safe_hide_popup(achieved_action_popup))
@@ -353,142 +756,162 @@ def show_todo_app(user_id):
             import traceback
             traceback.print_exc()
 
-    # Action functions for popup buttons
+    def selected_ids(status, clicked_id):
+        """Ids of the tasks an action applies to: the selection, else the clicked task"""
+        ids = row_pools[status].selected_ids()
+        if not ids and clicked_id is not None:
+            ids = [clicked_id]
+        return ids
+
+    def move_tasks(ids, from_status, to_status):
+        """Move rows between tabs and queue one batched status update"""
+        moved = [task for task in (remove_row(from_status, task_id) for task_id in ids) if task is not None]
+        for task in moved:
+            insert_row(to_status, task)
+        if moved:
+            writer.submit(lambda: db.move_many(user_id, [writer.resolve(task[0]) for task in moved], to_status),
+                          on_error=on_write_error)
+        return len(moved)
+
+    def delete_tasks(ids, status):
+        removed = [task for task in (remove_row(status, task_id) for task_id in ids) if task is not None]
+        if removed:
+            writer.submit(lambda: db.delete_many(user_id, [writer.resolve(task[0]) for task in removed]),
+                          on_error=on_write_error)
+        return len(removed)
+
+    # Action functions for popup buttons: patch the view now, write in the background
     def complete_selected():
-        nonlocal selected_index, ongoing_tasks
-        if selected_index is None:
+        nonlocal selected_id
+        ids = selected_ids("ongoing", selected_id)
+        if not ids:
             notification.show_notification("Please select a task to complete.", "error")
             return
-        task_text, timestamp = ongoing_tasks[selected_index]
-        conn = sqlite3.connect("users.db")
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE tasks SET status='achieved' 
-            WHERE user_id=? AND task_text=? AND timestamp=?
-        """, (user_id, task_text, timestamp))
-        conn.commit()
-        conn.close()
-        load_tasks()
+        count = move_tasks(ids, "ongoing", "achieved")
+        selected_id = None
         action_popup.place_forget()
-        notification.show_notification("Task marked as completed!", "success")
+        notification.show_notification(f"{count} tasks marked as completed!" if count > 1
+                                       else "Task marked as completed!", "success")
 
     def delete_selected():
-        nonlocal selected_index, ongoing_tasks
-        if selected_index is None:
+        nonlocal selected_id
+        ids = selected_ids("ongoing", selected_id)
+        if not ids:
             notification.show_notification("Please select a task to delete.", "error")
             return
         
-        try:
-            task_text, timestamp = ongoing_tasks[selected_index]
-            
-            # Delete from database immediately
-            conn = sqlite3.connect("users.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                DELETE FROM tasks 
-                WHERE user_id=? AND task_text=? AND timestamp=?
-            """, (user_id, task_text, timestamp))
-            conn.commit()
-            conn.close()
-            
-            # Hide popup immediately
-            action_popup.place_forget()
-            
-            # Refresh the list to remove from display
-            load_tasks()
-            
-            # Show success notification
-            notification.show_notification("Task deleted successfully!", "success")
-            
-        except Exception as e:
-            notification.show_notification(f"Error deleting task: {str(e)}", "error")
+        count = delete_tasks(ids, "ongoing")
+        selected_id = None
+        
+        # Hide popup immediately
+        action_popup.place_forget()
+        
+        # Show success notification
+        notification.show_notification(f"{count} tasks deleted successfully!" if count > 1
+                                       else "Task deleted successfully!", "success")
 
     def edit_selected():
-        nonlocal selected_index, ongoing_tasks
-        if selected_index is None:
+        nonlocal selected_id
+        if selected_id is None:
             notification.show_notification("Please select a task to edit.", "error")
             return
-        task_text, timestamp = ongoing_tasks[selected_index]
-        entry.delete(0, 'end')
-        entry.insert(0, task_text)
-        conn = sqlite3.connect("users.db")
-        cursor = conn.cursor()
-        cursor.execute("""
-            DELETE FROM tasks 
-            WHERE user_id=? AND task_text=? AND timestamp=?
-        """, (user_id, task_text, timestamp))
-        conn.commit()
-        conn.close()
-        load_tasks()
+        task = remove_row("ongoing", selected_id)
+        selected_id = None
+        if task is not None:
+            entry.delete(0, 'end')
+            entry.insert(0, task[1])
+            writer.submit(lambda: db.delete_task(user_id, writer.resolve(task[0])), on_error=on_write_error)
         action_popup.place_forget()
 
     # Action functions for achieved task popup buttons
     def move_back_to_ongoing_selected():
-        nonlocal selected_achieved_index, achieved_tasks
-        if selected_achieved_index is None:
+        nonlocal selected_achieved_id
+        ids = selected_ids("achieved", selected_achieved_id)
+        if not ids:
             notification.show_notification("Please select an achieved task to move back.", "error")
             return
-        task_text, timestamp = achieved_tasks[selected_achieved_index]
-        conn = sqlite3.connect("users.db")
-        cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE tasks SET status='ongoing' 
-            WHERE user_id=? AND task_text=? AND timestamp=?
-        """, (user_id, task_text, timestamp))
-        conn.commit()
-        conn.close()
-        load_tasks()
+        count = move_tasks(ids, "achieved", "ongoing")
+        selected_achieved_id = None
         achieved_action_popup.place_forget()
-        notification.show_notification("Task moved back to ongoing!", "success")
+        notification.show_notification(f"{count} tasks moved back to ongoing!" if count > 1
+                                       else "Task moved back to ongoing!", "success")
 
     def delete_achieved_selected():
-        nonlocal selected_achieved_index, achieved_tasks
-        if selected_achieved_index is None:
+        nonlocal selected_achieved_id
+        ids = selected_ids("achieved", selected_achieved_id)
+        if not ids:
             notification.show_notification("Please select an achieved task to delete.", "error")
             return
         
-        try:
-            task_text, timestamp = achieved_tasks[selected_achieved_index]
-            
-            # Delete from database immediately
-            conn = sqlite3.connect("users.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                DELETE FROM tasks 
-                WHERE user_id=? AND task_text=? AND timestamp=?
-            """, (user_id, task_text, timestamp))
-            conn.commit()
-            conn.close()
-            
-            # Hide popup immediately
-            achieved_action_popup.place_forget()
-            
-            # Refresh the list to remove from display
-            load_tasks()
-            
-            # Show success notification
-            notification.show_notification("Achieved task deleted successfully!", "success")
-            
-        except Exception as e:
-            notification.show_notification(f"Error deleting achieved task: {str(e)}", "error")
+        count = delete_tasks(ids, "achieved")
+        selected_achieved_id = None
+        
+        # Hide popup immediately
+        achieved_action_popup.place_forget()
+        
+        # Show success notification
+        notification.show_notification(f"{count} achieved tasks deleted successfully!" if count > 1
+                                       else "Achieved task deleted successfully!", "success")
+
+    async def show_pages(generation, read, paged=True):
+        """Render the (ongoing, achieved) rows read() returns, read behind the
+        queued writes. Dropped if a newer reload or search started meanwhile;
+        read again if more writes were queued while it ran."""
+        while True:
+            writes = writer.submitted
+            pages = await writer.run(read)
+            if generation != view_generation:
+                return
+            if writes == writer.submitted:
+                break
+        for status, page in zip(("ongoing", "achieved"), pages):
+            if paged:
+                has_more[status] = len(page) == PAGE_SIZE
+            render_tasks(status, page)
 
-    # Patch load_tasks to use the new renderer
+    # Full reload: first page of both tabs, straight from the database
     def load_tasks():
-        nonlocal ongoing_tasks, selected_index, achieved_tasks, selected_achieved_index
-        ongoing_tasks = []
-        achieved_tasks = []
-        selected_index = None
-        selected_achieved_index = None
-        
-        conn = sqlite3.connect("users.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT task_text, timestamp FROM tasks WHERE user_id=? AND status='ongoing' ORDER BY timestamp DESC", (user_id,))
-        ongoing_tasks = cursor.fetchall()
-        render_ongoing_tasks(ongoing_tasks)
-        cursor.execute("SELECT task_text, timestamp FROM tasks WHERE user_id=? AND status='achieved' ORDER BY timestamp DESC", (user_id,))
-        achieved_tasks = cursor.fetchall()
-        render_achieved_tasks(achieved_tasks)
-        conn.close()
+        nonlocal selected_id, selected_achieved_id, search_active, view_generation
+        selected_id = None
+        selected_achieved_id = None
+        search_active = False
+        view_generation += 1
+        # Only the first page of each tab; the rest is paged in on scroll
+        bridge.spawn(show_pages(view_generation, lambda: (db.list_tasks(user_id, "ongoing", PAGE_SIZE),
+                                                          db.list_tasks(user_id, "achieved", PAGE_SIZE))))
+
+    async def load_more(status):
+        """Append the next page of a tab below the rows already shown"""
+        rows = task_rows[status]
+        if search_active or not has_more[status] or not rows:
+            load_pending[status] = False
+            return
+        generation = view_generation
+        last = rows[-1]
+        last_id, _, last_timestamp = last
+        page = await writer.run(lambda: db.list_tasks(user_id, status, PAGE_SIZE,
+                                                      after=(last_timestamp, writer.resolve(last_id))))
+        load_pending[status] = False
+        if generation != view_generation or not rows or rows[-1] != last:
+            return  # the tab changed meanwhile; the next scroll asks again
+        has_more[status] = len(page) == PAGE_SIZE
+        render_tasks(status, page, append=True)
+
+    def page_in_near_bottom(scroll_frame, status):
+        # CTkScrollableFrame has no scroll event, so wrap the canvas ->
+        # scrollbar callback and request the next page when the view
+        # gets within 10% of the end (or the list doesn't fill the view).
+        canvas = scroll_frame._parent_canvas
+        set_scrollbar = scroll_frame._scrollbar.set
+        def on_scroll(first, last):
+            set_scrollbar(first, last)
+            if float(last) >= 0.9 and has_more[status] and not load_pending[status]:
+                load_pending[status] = True
+                bridge.spawn(load_more(status))
+        canvas.configure(yscrollcommand=on_scroll)
+
+    page_in_near_bottom(ongoing_scroll, "ongoing")
+    page_in_near_bottom(achieved_scroll, "achieved")
 
     search_frame = ctk.CTkFrame(phone_frame, fg_color="transparent")
     search_frame.pack(pady=10)
@@ -497,39 +920,17 @@ def show_todo_app(user_id):
 
     def search_tasks():
         """Search tasks in real-time"""
+        nonlocal search_active, view_generation
         query = search_entry.get().strip().lower()
         if query == "":
             load_tasks()
             return
-            
-        # Clear ongoing tasks
-        for widget in ongoing_scroll.winfo_children():
-            widget.destroy()
-        for widget in achieved_scroll.winfo_children():
-            widget.destroy()
-        
-        conn = sqlite3.connect("users.db")
-        cursor = conn.cursor()
-        
-        # Search in ongoing tasks
-        cursor.execute("""
-            SELECT task_text, timestamp FROM tasks 
-            WHERE user_id=? AND status='ongoing' AND task_text LIKE ? 
-            ORDER BY timestamp DESC
-        """, (user_id, f"%{query}%"))
-        ongoing_tasks = cursor.fetchall()
-        render_ongoing_tasks(ongoing_tasks)
-        
-        # Search in achieved tasks
-        cursor.execute("""
-            SELECT task_text, timestamp FROM tasks 
-            WHERE user_id=? AND status='achieved' AND task_text LIKE ? 
-            ORDER BY timestamp DESC
-        """, (user_id, f"%{query}%"))
-        achieved_tasks = cursor.fetchall()
-        render_achieved_tasks(achieved_tasks)
-        
-        conn.close()
+        search_active = True
+        view_generation += 1
+        # Search in ongoing and achieved tasks; a newer keystroke drops these results
+        bridge.spawn(show_pages(view_generation, lambda: (db.search_tasks(user_id, "ongoing", query),
+                                                          db.search_tasks(user_id, "achieved", query)),
+                                paged=False))
 
     # Bind search to real-time updates
     search_entry.bind("<KeyRelease>", lambda e: search_tasks())
@@ -543,40 +944,36 @@ def show_todo_app(user_id):
     entry = ctk.CTkEntry(entry_frame, placeholder_text="Enter task", width=250, font=("Arial", 14))
     entry.pack(side="left", padx=(0, 10), fill="x", expand=True)
 
+    @timed()
     def add_task():
         """Add new task to database"""
         task = entry.get().strip()
         if task:
             # Use ISO format for proper sorting, but display in readable format
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            conn = sqlite3.connect("users.db")
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO tasks (user_id, task_text, timestamp, status) 
-                VALUES (?, ?, ?, 'ongoing')
-            """, (user_id, task, timestamp))
-            conn.commit()
-            conn.close()
+            temp_id = writer.temp_id()
+
+            def insert():
+                real_id = db.add_task(user_id, task, timestamp)
+                writer.id_map[temp_id] = real_id
+                return real_id
+            writer.submit(insert, on_done=lambda real_id: swap_id(temp_id, real_id), on_error=on_write_error)
             
             entry.delete(0, 'end')
-            load_tasks()
+            if search_active:
+                load_tasks()  # leave the search results, as before
+            else:
+                insert_row("ongoing", (temp_id, task, timestamp))
 
     add_button = ctk.CTkButton(entry_frame, text="ADD", command=add_task, fg_color="green", width=80)
     add_button.pack(side="right")
 
     def clear_all_achieved():
         # No confirmation dialog, just clear
-        try:
-            conn = sqlite3.connect("users.db")
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM tasks WHERE user_id=? AND status='achieved'", (user_id,))
-            conn.commit()
-            conn.close()
-            load_tasks()
-            notification.show_notification("All achieved tasks cleared!", "success")
-        except Exception as e:
-            notification.show_notification(f"Error clearing achieved tasks: {str(e)}", "error")
+        render_achieved_tasks([])
+        has_more["achieved"] = False
+        writer.submit(lambda: db.delete_by_status(user_id, "achieved"), on_error=on_write_error)
+        notification.show_notification("All achieved tasks cleared!", "success")
 
     # Create popup frame for action buttons - SIMPLIFIED VERSION
     action_popup = ctk.CTkFrame(window, fg_color="#1b1e27", corner_radius=5, width=120, height=100)  # RED for visibility
@@ -625,12 +1022,135 @@ def show_todo_app(user_id):
     achieved_buttons_frame = ctk.CTkFrame(window, fg_color="transparent")
     achieved_buttons_frame.pack(pady=5)
 
+    # Import / export, streamed on a worker thread (see tegbar_io)
+    transfer = None
+    transfer_format = ctk.CTkOptionMenu(achieved_buttons_frame, values=["JSON", "NDJSON", "CSV"], width=90)
+    transfer_format.set("JSON")
+    transfer_format.pack(side="left", padx=5)
+    transfer_label = ctk.CTkLabel(window, text="", text_color="#888888")
+
+    def start_transfer(text):
+        if transfer is not None:
+            notification.show_notification("An import or export is already running.", "error")
+            return False
+        transfer_label.configure(text=text)
+        transfer_label.pack(pady=(0, 5))
+        return True
+
+    def end_transfer():
+        nonlocal transfer
+        transfer = None
+        transfer_label.pack_forget()
+
+    def show_transfer_progress(count, fraction):
+        transfer_label.configure(text=f"{count:,} tasks ({fraction:.0%})")
+
+    def export_tasks():
+        nonlocal transfer
+        fmt = transfer_format.get().lower()
+        if not start_transfer("Exporting..."):
+            return
+        dest = f"tegbar_list_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{fmt}"
+
+        def records(t):
+            for status in ("ongoing", "achieved"):
+                for task_id, task_text, timestamp in db.iter_tasks(user_id, status):
+                    t.check()  # a cancelled export stops here and its .part file is removed
+                    yield {"id": str(task_id), "date": timestamp[:10], "text": task_text,
+                           "done": status == "achieved", "created": timestamp}
+
+        def work(t):
+            total = db.query("SELECT COUNT(*) FROM tasks WHERE user_id=?", (user_id,))[0][0] or 1
+            return tegbar_io.write_records(dest, records(t), fmt, progress=lambda count: t.report(count, count / total))
+
+        def done(count):
+            end_transfer()
+            notification.show_notification(f"Exported {count} tasks to {dest}", "success")
+
+        def failed(error):
+            end_transfer()
+            notification.show_notification(f"Export failed: {error}", "error")
+
+        # on the writer thread, behind the queued writes: export what is really stored
+        transfer = tegbar_io.Transfer(lambda fn: bridge.submit(fn, executor=writer.executor), bridge.post, work,
+                                      on_progress=show_transfer_progress, on_done=done, on_error=failed)
+
+    def import_tasks():
+        nonlocal transfer
+        path = filedialog.askopenfilename(
+            title="Import tasks",
+            filetypes=[("Task files", "*.json *.ndjson *.jsonl *.csv"), ("All files", "*.*")])
+        if not path or not start_transfer("Importing..."):
+            return
+        fmt = None
+        try:
+            tegbar_io.format_of(path)
+        except ValueError:
+            fmt = transfer_format.get().lower()  # unknown extension: trust the menu
+
+        def timestamp_of(record):
+            created = tegbar_io.parse_created(record["created"]) or tegbar_io.parse_created(record["date"])
+            return (created or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+
+        def work(t):
+            # each batch is its own transaction, so the UI can read in between
+            count = 0
+            for batch in tegbar_io.batched(tegbar_io.read_records(path, fmt, progress=t.report)):
+                if t.cancelled:
+                    break
+                for status, done in (("ongoing", False), ("achieved", True)):
+                    rows = [(r["text"], timestamp_of(r)) for r in batch if r["done"] == done]
+                    if rows:
+                        db.bulk_insert(user_id, rows, status)
+                count += len(batch)
+            return count
+
+        def done(count):
+            end_transfer()
+            if not search_active:
+                load_tasks()
+            notification.show_notification(f"Imported {count} tasks!", "success")
+
+        def failed(error):
+            end_transfer()
+            load_tasks()
+            notification.show_notification(f"Import failed: {error}", "error")
+
+        transfer = tegbar_io.Transfer(bridge.submit, bridge.post, work,
+                                      on_progress=show_transfer_progress, on_done=done, on_error=failed)
+
+    ctk.CTkButton(achieved_buttons_frame, text="Export", command=export_tasks, fg_color="green",
+                  width=80).pack(side="left", padx=5)
+    ctk.CTkButton(achieved_buttons_frame, text="Import", command=import_tasks, fg_color="green",
+                  width=80).pack(side="left", padx=5)
+
     # Bind Enter key to add task
     window.bind("<Return>", lambda e: add_task())
 
+    def on_close():
+        if transfer is not None:
+            transfer.cancel()
+        window.withdraw()
+        bridge.spawn(close_when_written())
+
+    async def close_when_written():
+        if transfer is not None:
+            # an import runs on the bridge's workers and still uses the database
+            await bridge.run_in_thread(transfer.finished.wait)
+        await writer.run(lambda: None)  # don't lose queued writes (a running export ends first)
+        window.after_idle(shut_down)  # the bridge can't close from inside its own loop
+
+    def shut_down():
+        writer.close()
+        bridge.close()
+        window.destroy()
+
+    window.protocol("WM_DELETE_WINDOW", on_close)
+
     # Load initial tasks
     load_tasks()
 
+    window.after_idle(lambda: record("startup: todo window", time.perf_counter() - started))
     window.mainloop()
 
 # ---------------------- LOGIN PAGE ----------------------
@@ -643,7 +1163,8 @@ def show_login_window():
     login_win.geometry("600x300")
     #login_win.iconbitmap('output_icon.ico')
     # Create notification system for login window
-    notification = AnimatedNotification(login_win)
+    bridge = AsyncBridge(login_win)
+    notification = AnimatedNotification(login_win, bridge)
 
     ctk.CTkLabel(login_win, text="Welcome to Tegbar List!", font=("Arial Black", 20)).pack(pady=20)
 
@@ -659,15 +1180,12 @@ def show_login_window():
         username = username_entry.get()
         password = hash_password(password_entry.get())
 
-        conn = sqlite3.connect("users.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT id FROM users WHERE username=? AND password=?", (username, password))
-        user = cursor.fetchone()
-        conn.close()
+        user_id = get_db().find_user(username, password)
 
-        if user:
+        if user_id is not None:
+            bridge.close()
             login_win.destroy()
-            show_todo_app(user[0])  # Pass user_id to todo app
+            show_todo_app(user_id)  # Pass user_id to todo app
         else:
             notification.show_notification("Invalid username or password.", "error")
 
@@ -681,11 +1199,7 @@ def show_login_window():
 
         hashed = hash_password(password)
         try:
-            conn = sqlite3.connect("users.db")
-            cursor = conn.cursor()
-            cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", (username, hashed))
-            conn.commit()
-            conn.close()
+            get_db().create_user(username, hashed)
             notification.show_notification("Sign up successful! Now log in.", "success")
         except sqlite3.IntegrityError:
             notification.show_notification("Username already exists.", "error")
@@ -695,9 +1209,52 @@ def show_login_window():
     # Bind Enter key to login
     login_win.bind("<Return>", lambda e: login())
 
+    def on_close():
+        bridge.close()  # a toast may still be on screen
+        login_win.destroy()
+
+    login_win.protocol("WM_DELETE_WINDOW", on_close)
+
     login_win.mainloop()
 
+# ---------------------- BENCHMARK ----------------------
+def run_benchmark(rows=10000):
+    """Time batch vs one-commit-per-row task writes on a scratch database"""
+    import os
+    import tempfile
+
+    def measure(label, action):
+        start = time.perf_counter()
+        action()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<28}{elapsed * 1000:>10.1f} ms{rows / elapsed:>12,.0f} rows/s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "bench.db"))
+        db.migrate()
+        db.create_user("bench", hash_password("bench"))
+        user_id = db.find_user("bench", hash_password("bench"))
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        texts = [f"Benchmark task {i}" for i in range(rows)]
+        print(f"{rows:,} rows")
+
+        ids = []
+        measure("add_task (one by one)", lambda: ids.extend(db.add_task(user_id, t, timestamp) for t in texts))
+        measure("set_status (one by one)", lambda: [db.set_status(user_id, i, "achieved") for i in ids])
+        measure("delete_task (one by one)", lambda: [db.delete_task(user_id, i) for i in ids])
+
+        ids = []
+        measure("bulk_insert", lambda: ids.extend(db.bulk_insert(user_id, [(t, timestamp) for t in texts])))
+        measure("complete_many", lambda: db.complete_many(user_id, ids))
+        measure("move_many", lambda: db.move_many(user_id, ids, "ongoing"))
+        measure("delete_many", lambda: db.delete_many(user_id, ids))
+        db.close()
+
 # ---------------------- MAIN ENTRY ----------------------
 if __name__ == "__main__":
+    if "--benchmark" in sys.argv:
+        run_benchmark()
+        sys.exit()
     init_db()
-show_login_window()
+    show_login_window()
+    get_db().close()
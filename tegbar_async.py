@@ -0,0 +1,253 @@
+"""asyncio inside the Tk mainloop, shared by the Tegbar apps.
+
+AsyncBridge drives an asyncio event loop from Tk's own loop: an after()
+callback runs one iteration of the asyncio loop (ready callbacks, due timers
+and socket I/O, without blocking), so coroutines run on the Tk thread
+between Tk events and may touch widgets directly. A coroutine waiting on
+asyncio.sleep() or a socket costs no thread, so thousands of pending
+operations are thousands of tasks, not thousands of threads.
+
+The loop is also the apps' only queue into the Tk thread: post() may be
+called from any thread, and blocking work handed to submit() or
+run_in_thread() reports back through it.
+
+Where Tk can watch file descriptors (not on Windows) and the loop's
+selector has one of its own (epoll, kqueue), Tk watches that descriptor:
+it becomes readable when a socket the loop waits on is ready or another
+thread calls post(), so the loop runs exactly when there is something to
+do, plus at the due time of its next timer, and not at all while idle.
+Elsewhere the loop is polled: right away while callbacks are ready, at the
+next timer, every JOB_MS while a worker job is out, every IO_MS while tasks
+may be waiting on sockets, and every HEARTBEAT_MS otherwise (enough for a
+stray post() from another thread). A tick only runs what is ready at that
+moment, which keeps the time taken from Tk predictable; like a slow Tk
+callback, a coroutine that computes for long without awaiting still holds
+up the UI.
+
+    bridge = AsyncBridge(window)
+    bridge.spawn(some_coroutine())
+    ...
+    bridge.close()  # before window.destroy()
+"""
+import asyncio
+import concurrent.futures
+import math
+import sys
+import threading
+import time
+import tkinter
+
+from tegbar_profile import record
+
+
+class AsyncBridge:
+    JOB_MS = 10
+    IO_MS = 50
+    HEARTBEAT_MS = 250
+    WORKERS = 2  # threads of the default executor
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.loop = asyncio.new_event_loop()
+        self.executor = concurrent.futures.ThreadPoolExecutor(self.WORKERS, thread_name_prefix="tegbar-worker")
+        self.tasks = set()  # spawned and not finished
+        self.jobs = 0  # submit() / run_in_thread() calls still running
+        self.ticks = 0
+        self.last_tick = 0.0  # ms spent in the last iteration
+        self.max_tick = 0.0
+        self.posted = 0  # post() calls whose callback hasn't run yet
+        self.max_posted = 0
+        self.last_latency = 0.0  # ms between post() and the callback running
+        self.max_latency = 0.0
+        self._ui_thread = threading.get_ident()
+        self._lock = threading.Lock()  # guards posted / jobs
+        self._job = None  # after() id of the next tick
+        self._due = None  # perf_counter() time it is scheduled for
+        self._watched = None  # selector fd Tk watches for us, if any
+        self._watch()
+        self._schedule(0)
+
+    # ---------- entry points ----------
+    def spawn(self, coro):
+        """Schedule coro on the loop. Errors are reported like those of Tk callbacks."""
+        task = self.loop.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self._finished)
+        self.wake()
+        return task
+
+    def post(self, callback, *args):
+        """Run callback(*args) on the Tk thread, in order with other posts; any thread."""
+        with self._lock:
+            self.posted += 1
+            self.max_posted = max(self.max_posted, self.posted)
+        item = (self._run_posted, callback, args, time.perf_counter())
+        if threading.get_ident() == self._ui_thread:
+            self.loop.call_soon(*item)
+            self.wake()
+            return
+        try:
+            self.loop.call_soon_threadsafe(*item)
+        except RuntimeError:
+            pass  # loop closed: the window is gone
+
+    def submit(self, fn, *args, on_done=None, on_error=None, executor=None):
+        """Run fn(*args) on a worker thread; on_done(result) or on_error(exc)
+        then run on the Tk thread. Call from the Tk thread."""
+        self._job_started()
+        future = (executor or self.executor).submit(fn, *args)
+
+        def finished(future):
+            self._job_ended()
+            if future.cancelled():
+                return  # dropped by close()
+            error = future.exception()
+            if error is not None:
+                if on_error:
+                    self.post(on_error, error)
+            elif on_done:
+                self.post(on_done, future.result())
+        future.add_done_callback(finished)
+        return future
+
+    async def run_in_thread(self, fn, *args, executor=None):
+        """Await fn(*args) run on a worker thread"""
+        self._job_started()
+        try:
+            return await self.loop.run_in_executor(executor or self.executor, fn, *args)
+        finally:
+            self._job_ended()
+
+    def wake(self):
+        """Run the loop as soon as Tk is idle; for Tk callbacks that hand the
+        loop something to do (a put on an asyncio.Queue, say)."""
+        if threading.get_ident() == self._ui_thread and not self.loop.is_closed():
+            self._schedule(0)
+
+    # ---------- internals ----------
+    def _job_started(self):
+        with self._lock:
+            self.jobs += 1
+        self.wake()
+
+    def _job_ended(self):
+        with self._lock:
+            self.jobs -= 1
+
+    def _run_posted(self, callback, args, posted):
+        waited = time.perf_counter() - posted
+        with self._lock:
+            self.posted -= 1
+        self.last_latency = waited * 1000
+        self.max_latency = max(self.max_latency, self.last_latency)
+        record("AsyncBridge post latency", waited)
+        try:
+            callback(*args)
+        except Exception:
+            self.widget.report_callback_exception(*sys.exc_info())
+
+    def _finished(self, task):
+        self.tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            exc = task.exception()
+            self.widget.report_callback_exception(type(exc), exc, exc.__traceback__)
+
+    def _watch(self):
+        # _selector is private to BaseSelectorEventLoop; the proactor loop
+        # (Windows) has none, and Tk can't watch descriptors there anyway
+        selector = getattr(self.loop, "_selector", None)
+        tk = getattr(self.widget, "tk", None)
+        if not hasattr(selector, "fileno") or not hasattr(tk, "createfilehandler"):
+            return  # select() and poll() selectors have no descriptor of their own
+        self._watched = selector.fileno()
+        tk.createfilehandler(self._watched, tkinter.READABLE, self._readable)
+
+    def _unwatch(self):
+        if self._watched is not None:
+            self.widget.tk.deletefilehandler(self._watched)
+            self._watched = None
+
+    def _readable(self, fd, mask):
+        if self.loop.is_running():
+            # a coroutine runs a nested Tk loop (a dialog): stop watching, or
+            # Tk would call us back for as long as the events stay unread
+            self._unwatch()
+            self._schedule(self.JOB_MS)
+            return
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        self._pump()
+
+    def _schedule(self, delay_ms):
+        due = time.perf_counter() + delay_ms / 1000
+        if self._job is not None:
+            if self._due <= due:
+                return  # already coming sooner
+            self.widget.after_cancel(self._job)
+        self._due = due
+        self._job = self.widget.after(delay_ms, self._pump)
+
+    def _next_delay(self):
+        """ms until the next tick is needed, or None to wait for Tk's file event"""
+        # BaseEventLoop keeps ready callbacks in _ready and timers in _scheduled
+        loop = self.loop
+        if getattr(loop, "_ready", None):
+            return 0
+        if self._watched is not None:
+            delay = None  # I/O and posts from other threads wake us
+        elif self.jobs:
+            delay = self.JOB_MS
+        elif self.tasks:
+            delay = self.IO_MS
+        else:
+            delay = self.HEARTBEAT_MS
+        timers = getattr(loop, "_scheduled", None)
+        if timers:
+            due = max(0, math.ceil((timers[0].when() - loop.time()) * 1000))
+            delay = due if delay is None else min(delay, due)
+        return delay
+
+    def _pump(self):
+        self._job = None
+        if self.loop.is_running():
+            # a coroutine is running a nested Tk loop (e.g. a dialog): come back later
+            self._schedule(self.JOB_MS)
+            return
+        start = time.perf_counter()
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        spent = time.perf_counter() - start
+        self.ticks += 1
+        self.last_tick = spent * 1000
+        self.max_tick = max(self.max_tick, self.last_tick)
+        record("AsyncBridge tick", spent)
+        if self._watched is None:
+            self._watch()  # again, after a nested Tk loop
+        delay = self._next_delay()
+        if delay is not None:
+            self._schedule(delay)
+
+    def stats(self):
+        return {"tasks": len(self.tasks), "jobs": self.jobs, "ticks": self.ticks,
+                "last_tick_ms": round(self.last_tick, 2), "max_tick_ms": round(self.max_tick, 2),
+                "posted": self.posted, "max_posted": self.max_posted,
+                "last_latency_ms": round(self.last_latency, 2), "max_latency_ms": round(self.max_latency, 2)}
+
+    def close(self):
+        """Cancel every task, let them clean up and close the loop"""
+        if self._job is not None:
+            self.widget.after_cancel(self._job)
+            self._job = None
+        if self.loop.is_closed():
+            return
+        self._unwatch()
+        tasks = list(self.tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+        self.loop.close()
+        # running jobs finish on their own; their results have nowhere to go
+        self.executor.shutdown(wait=False, cancel_futures=True)
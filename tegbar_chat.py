@@ -0,0 +1,372 @@
+"""Team chat transport: a small asyncio server and a client for the Tk app.
+
+Messages travel as newline-delimited JSON frames over TCP:
+
+    {"type": "hello", "user": ..., "session": ..., "received": seq}   client -> server, first frame
+    {"type": "send", "messages": [{"id", "to", "text", "time"}, ...]}
+    {"type": "deliver", "messages": [{"seq", "from", "text", "time"}, ...]}
+    {"type": "ack", "upto": n}                           both ways
+
+Both ends batch: whatever is queued when the writer wakes up goes out as one
+frame. A message stays with its sender until it is acknowledged; after a
+reconnect the client resends what the server hasn't acknowledged and the
+server replays the deliveries after the client's "received" seq, and each
+side drops what it has already seen, so nothing is lost or doubled. Message
+ids count from 1 in each client session (one per ChatSession, i.e. per app
+start), so the server tracks the newest id per session, not per user.
+
+ChatServer stands in for a real backend on the loopback interface: every
+contact answers each message with "Acknowledged." after a short delay.
+
+    python tegbar_chat.py serve [--port 8765]
+    python tegbar_chat.py load-test [--clients 50 --contacts 20 --messages 200 --disconnect --restart]
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+HOST = "127.0.0.1"
+PORT = 8765
+MAX_BATCH = 256  # messages per frame
+MAX_FRAME = 1 << 22  # longest line the readers accept
+
+
+def encode(frame):
+    return (json.dumps(frame, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+async def read_frame(reader):
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("connection closed")
+    return json.loads(line)
+
+
+async def pump(writer, pending, kind):
+    """Write the ("msg", message) and ("ack", n) items queued on pending,
+    everything queued so far as one frame of the given kind plus one ack."""
+    while True:
+        items = [await pending.get()]
+        while len(items) < MAX_BATCH and not pending.empty():
+            items.append(pending.get_nowait())
+        messages = [payload for what, payload in items if what == "msg"]
+        acks = [payload for what, payload in items if what == "ack"]
+        data = b""
+        if messages:
+            data += encode({"type": kind, "messages": messages})
+        if acks:
+            data += encode({"type": "ack", "upto": max(acks)})
+        writer.write(data)
+        await writer.drain()
+
+
+# ---------- server ----------
+class _Mailbox:
+    """Server-side state of one user, kept across connections"""
+    MAX_SESSIONS = 16  # client sessions whose last id is remembered
+
+    def __init__(self):
+        self.last_ids = OrderedDict()  # client session -> newest message id handled, oldest first
+        self.seq = 0  # newest delivery seq handed out
+        self.unacked = OrderedDict()  # seq -> delivered message
+        self.pending = None  # asyncio.Queue of the live connection's writer
+        self.writer = None
+
+    def deliver(self, message):
+        self.seq += 1
+        message = {**message, "seq": self.seq}
+        self.unacked[self.seq] = message
+        if self.pending is not None:
+            self.pending.put_nowait(("msg", message))
+
+    def acked(self, upto):
+        while self.unacked and next(iter(self.unacked)) <= upto:
+            self.unacked.popitem(last=False)
+
+    def last_id(self, session):
+        """Newest id handled for session; a new session starts from 0"""
+        last = self.last_ids.setdefault(session, 0)
+        self.last_ids.move_to_end(session)
+        while len(self.last_ids) > self.MAX_SESSIONS:
+            self.last_ids.popitem(last=False)
+        return last
+
+
+class ChatServer:
+    REPLY = "Acknowledged."
+
+    def __init__(self, reply_delay=1.0, silent=()):
+        self.reply_delay = reply_delay
+        self.silent = set(silent)  # contacts that never answer
+        self.users = {}  # user -> _Mailbox
+        self.received = 0
+        self.connections = {}  # writer -> handler task
+        self.server = None
+
+    async def start(self, host=HOST, port=0):
+        """Listen on host:port (0 = any free port); returns the port."""
+        self.server = await asyncio.start_server(self.handle, host, port, limit=MAX_FRAME)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        self.drop_connections()
+        # let the handlers see their connections end before the loop goes away
+        await asyncio.gather(*self.connections.values(), return_exceptions=True)
+        await self.server.wait_closed()
+
+    def drop_connections(self):
+        """Close every client connection (the load test uses it to force reconnects)"""
+        for writer in list(self.connections):
+            writer.close()
+
+    async def handle(self, reader, writer):
+        box = None
+        pump_task = None
+        self.connections[writer] = asyncio.current_task()
+        try:
+            hello = await read_frame(reader)
+            if hello.get("type") != "hello":
+                return
+            user, session = hello["user"], hello.get("session", "")
+            box = self.users.setdefault(user, _Mailbox())
+            if box.writer is not None:
+                box.writer.close()  # a newer connection replaces the old one
+            box.writer, box.pending = writer, asyncio.Queue()
+            pump_task = asyncio.create_task(pump(writer, box.pending, "deliver"))
+            # replay what the client hasn't seen yet
+            box.acked(hello.get("received", 0))
+            for message in box.unacked.values():
+                box.pending.put_nowait(("msg", message))
+            while True:
+                frame = await read_frame(reader)
+                if frame["type"] == "send":
+                    last_id = box.last_id(session)
+                    for message in frame["messages"]:
+                        if message["id"] <= last_id:
+                            continue  # resent after a reconnect
+                        last_id = message["id"]
+                        self.received += 1
+                        self.on_message(user, message)
+                    box.last_ids[session] = last_id
+                    box.pending.put_nowait(("ack", last_id))
+                elif frame["type"] == "ack":
+                    box.acked(frame["upto"])
+        except (ConnectionError, ValueError, KeyError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if pump_task is not None:
+                pump_task.cancel()
+            if box is not None and box.writer is writer:
+                box.writer = box.pending = None
+            del self.connections[writer]
+            writer.close()
+
+    def on_message(self, user, message):
+        contact = message.get("to")
+        if not contact or contact in self.silent:
+            return
+        reply = {"from": contact, "text": self.REPLY, "time": datetime.now().strftime("%H:%M")}
+        box = self.users[user]
+        if self.reply_delay:
+            asyncio.get_running_loop().call_later(self.reply_delay, box.deliver, reply)
+        else:
+            box.deliver(reply)
+
+
+# ---------- client ----------
+class ChatSession:
+    """One user's side of the protocol, run inside an event loop.
+
+    run() connects, reconnects with backoff when the connection drops and
+    keeps going until cancelled. send() must be called on the loop's thread.
+    received is the newest delivery seq the caller has already stored, if it
+    keeps one across restarts.
+    """
+    RETRY_MIN = 0.2
+    RETRY_MAX = 5.0
+
+    def __init__(self, user, host=HOST, port=PORT, on_message=None, on_status=None, received=0):
+        self.user = user
+        self.session = uuid.uuid4().hex  # message ids below are only unique within it
+        self.host = host
+        self.port = port
+        self.on_message = on_message  # (message) for each new delivery
+        self.on_status = on_status  # ("connected" | "offline")
+        self.next_id = 0
+        self.unacked = OrderedDict()  # id -> message sent but not acknowledged
+        self.received = received  # newest delivery seq handled
+        self.acked = 0
+        self.reconnects = 0
+        self.pending = None  # asyncio.Queue while connected
+
+    def send(self, to, text, time=""):
+        self.next_id += 1
+        message = {"id": self.next_id, "to": to, "text": text, "time": time}
+        self.unacked[self.next_id] = message
+        if self.pending is not None:
+            self.pending.put_nowait(("msg", message))
+        return self.next_id
+
+    def status(self, state):
+        if self.on_status:
+            self.on_status(state)
+
+    async def run(self):
+        delay = self.RETRY_MIN
+        connected_before = False
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(self.host, self.port, limit=MAX_FRAME)
+            except OSError:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.RETRY_MAX)
+                continue
+            delay = self.RETRY_MIN
+            if connected_before:
+                self.reconnects += 1
+            connected_before = True
+            writer.write(encode({"type": "hello", "user": self.user, "session": self.session,
+                                 "received": self.received}))
+            self.pending = asyncio.Queue()
+            for message in self.unacked.values():
+                self.pending.put_nowait(("msg", message))
+            pump_task = asyncio.create_task(pump(writer, self.pending, "send"))
+            self.status("connected")
+            try:
+                await self.read(reader)
+            except (ConnectionError, ValueError, KeyError, asyncio.IncompleteReadError):
+                pass
+            finally:
+                self.pending = None
+                pump_task.cancel()
+                writer.close()
+            self.status("offline")
+
+    async def read(self, reader):
+        while True:
+            frame = await read_frame(reader)
+            if frame["type"] == "deliver":
+                for message in frame["messages"]:
+                    if message["seq"] <= self.received:
+                        continue  # replayed after a reconnect
+                    self.received = message["seq"]
+                    if self.on_message:
+                        self.on_message(message)
+                self.pending.put_nowait(("ack", self.received))
+            elif frame["type"] == "ack":
+                while self.unacked and next(iter(self.unacked)) <= frame["upto"]:
+                    self.unacked.popitem(last=False)
+                    self.acked += 1
+
+
+# ---------- load test ----------
+async def load_test(clients=50, contacts=20, messages=200, host=HOST, port=None, disconnect=False,
+                    restart=False):
+    """Send messages from many sessions to many contacts and wait for every
+    ack and reply. With disconnect, all connections are dropped halfway;
+    with restart, every client is replaced halfway by a new session for the
+    same user, as when the app is closed and started again."""
+    server = None
+    if port is None:
+        server = ChatServer(reply_delay=0)
+        port = await server.start(host)
+    names = [f"contact-{i:03d}" for i in range(contacts)]
+    replies = [0] * clients
+    callbacks = []
+    for i in range(clients):
+        def on_message(message, i=i):
+            replies[i] += 1
+        callbacks.append(on_message)
+    users = [f"load-{i:03d}-{random.getrandbits(32):08x}" for i in range(clients)]
+    sessions = [ChatSession(users[i], host, port, on_message=callbacks[i]) for i in range(clients)]
+    tasks = [asyncio.create_task(s.run()) for s in sessions]
+    acked_before = restarts = 0  # acks counted by replaced sessions
+
+    async def connected():
+        while any(s.pending is None for s in sessions):
+            await asyncio.sleep(0.01)
+    await connected()
+
+    start = time.perf_counter()
+    for n in range(messages):
+        for s in sessions:
+            s.send(random.choice(names), f"message {n}")
+        if n == messages // 2:
+            if disconnect and server is not None:
+                await asyncio.sleep(0)
+                server.drop_connections()
+            if restart:
+                # a closing app loses what it hasn't sent: let that go out first
+                while any(s.unacked for s in sessions):
+                    await asyncio.sleep(0.005)
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                acked_before += sum(s.acked for s in sessions)
+                # ids start again at 1 in the new sessions
+                sessions = [ChatSession(users[i], host, port, on_message=callbacks[i], received=s.received)
+                            for i, s in enumerate(sessions)]
+                tasks = [asyncio.create_task(s.run()) for s in sessions]
+                restarts += clients
+                await connected()
+        if n % 50 == 0:
+            await asyncio.sleep(0)  # let the writers run while the backlog builds
+    total = clients * messages
+    while acked_before + sum(s.acked for s in sessions) < total or sum(replies) < total:
+        await asyncio.sleep(0.005)
+    elapsed = time.perf_counter() - start
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    if server is not None:
+        await server.close()
+    return {
+        "clients": clients, "contacts": contacts, "messages": total,
+        "seconds": round(elapsed, 3), "messages_per_second": round(total / elapsed),
+        "replies": sum(replies), "exactly_once": all(r == messages for r in replies),
+        "reconnects": sum(s.reconnects for s in sessions), "restarts": restarts,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="run the loopback stand-in server")
+    serve.add_argument("--host", default=HOST)
+    serve.add_argument("--port", type=int, default=PORT)
+    serve.add_argument("--reply-delay", type=float, default=1.0)
+    test = sub.add_parser("load-test", help="measure message throughput")
+    test.add_argument("--clients", type=int, default=50)
+    test.add_argument("--contacts", type=int, default=20)
+    test.add_argument("--messages", type=int, default=200, help="per client")
+    test.add_argument("--port", type=int, help="use a running server instead of an in-process one")
+    test.add_argument("--disconnect", action="store_true", help="drop every connection halfway")
+    test.add_argument("--restart", action="store_true", help="replace every client by a new session halfway")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        async def serve_forever():
+            server = ChatServer(reply_delay=args.reply_delay)
+            port = await server.start(args.host, args.port)
+            print(f"Tegbar chat stand-in listening on {args.host}:{port}")
+            await server.server.serve_forever()
+        try:
+            asyncio.run(serve_forever())
+        except KeyboardInterrupt:
+            pass
+    else:
+        result = asyncio.run(load_test(args.clients, args.contacts, args.messages,
+                                       port=args.port, disconnect=args.disconnect, restart=args.restart))
+        for key, value in result.items():
+            print(f"{key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
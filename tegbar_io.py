@@ -0,0 +1,349 @@
+"""Streaming import / export of Tegbar tasks as JSON, NDJSON or CSV.
+
+Tasks travel as flat records with the fields in FIELDS. Writers take any
+iterable of records and readers yield records one at a time, so a file of
+any size passes through in memory bounded by one batch. Both apps (the
+JSON store of 101tegbar.py and the tasks table of tegbar-list.py) convert
+their own rows to and from these records.
+"""
+import csv
+import io
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+
+FIELDS = ("id", "date", "text", "time", "priority", "done", "notes", "created")
+FORMATS = ("json", "ndjson", "csv")
+PRIORITIES = ("Low", "Normal", "High")
+BATCH_SIZE = 1000  # records handed over per batch
+CHUNK_SIZE = 1 << 16  # bytes read at a time by the JSON reader
+
+
+class Cancelled(Exception):
+    """Raised by Transfer.check() once the transfer was cancelled"""
+
+
+def format_of(path):
+    """json / ndjson / csv from the file extension (.jsonl counts as ndjson)"""
+    suffix = Path(path).suffix.lower().lstrip(".")
+    if suffix in ("ndjson", "jsonl"):
+        return "ndjson"
+    if suffix in FORMATS:
+        return suffix
+    raise ValueError(f"Unknown file type: {Path(path).name}")
+
+
+def normalize(record):
+    """A record with every field of FIELDS, or None if it has no text.
+
+    Accepts what the writers below produce as well as loosely typed input
+    (CSV strings, missing fields, tegbar-list style "task_text"/"timestamp").
+    """
+    if not isinstance(record, dict):
+        return None
+    text = str(record.get("text") or record.get("task_text") or "").strip()
+    if not text:
+        return None
+    created = str(record.get("created") or record.get("timestamp") or "")
+    date = str(record.get("date") or created[:10])
+    done = record.get("done", record.get("status") == "achieved")
+    if isinstance(done, str):
+        done = done.strip().lower() in ("1", "true", "yes", "y", "achieved")
+    priority = str(record.get("priority") or "Normal").capitalize()
+    return {
+        "id": str(record.get("id") or ""),
+        "date": date,
+        "text": text,
+        "time": str(record.get("time") or ""),
+        "priority": priority if priority in PRIORITIES else "Normal",
+        "done": bool(done),
+        "notes": str(record.get("notes") or ""),
+        "created": created,
+    }
+
+
+def parse_created(created):
+    """datetime from an ISO or "YYYY-MM-DD HH:MM:SS" string, or None"""
+    try:
+        return datetime.fromisoformat(created)
+    except (TypeError, ValueError):
+        return None
+
+
+def batched(records, size=BATCH_SIZE):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+# ---------- writing ----------
+def write_records(path, records, fmt=None, progress=None):
+    """Stream records to path; returns how many were written.
+
+    The file is written under a temporary name and moved into place at the
+    end; if anything fails (or records raises, e.g. Cancelled) the partial
+    file is removed, so a failed export never leaves one behind.
+    progress, if given, is called with the running count every BATCH_SIZE
+    records.
+    """
+    path = Path(path)
+    fmt = fmt or format_of(path)
+    tmp = path.with_name(path.name + ".part")
+    count = 0
+    try:
+        with tmp.open("w", encoding="utf-8", newline="") as f:
+            if fmt == "csv":
+                writer = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+                writer.writeheader()
+            elif fmt == "json":
+                f.write("[")
+            for record in records:
+                if fmt == "csv":
+                    writer.writerow(record)
+                else:
+                    line = json.dumps(record, ensure_ascii=False)
+                    if fmt == "json":
+                        # one record per line keeps the file readable and diffable
+                        line = ("\n" if count == 0 else ",\n") + line
+                    else:
+                        line += "\n"
+                    f.write(line)
+                count += 1
+                if progress and count % BATCH_SIZE == 0:
+                    progress(count)
+            if fmt == "json":
+                f.write("\n]\n")
+        tmp.replace(path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    if progress:
+        progress(count)
+    return count
+
+
+# ---------- reading ----------
+class _CountingReader(io.RawIOBase):
+    """Binary file wrapper that remembers how many bytes were read"""
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = self.raw.readinto(b)
+        self.bytes_read += n or 0
+        return n
+
+    def close(self):
+        self.raw.close()
+        super().close()
+
+
+class _JsonStream:
+    """Pulls one JSON value at a time out of a text file.
+
+    Only the containers the caller walks through ([...] or {"key": ...}) are
+    parsed by hand; each element is decoded by json's own raw_decode, so no
+    more than one element plus one chunk is ever held in memory.
+    """
+    def __init__(self, f):
+        self.f = f
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def fill(self):
+        chunk = self.f.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next non-whitespace character ("" at the end of the file)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, chars):
+        ch = self.peek()
+        if ch not in chars or not ch:
+            raise ValueError(f"Invalid JSON: expected {chars!r}, found {ch or 'end of file'!r}")
+        self.pos += 1
+        return ch
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # the value runs past the buffer; read more and try again
+                if not self.fill():
+                    raise
+                continue
+            if end == len(self.buf) and not self.eof and not isinstance(value, (dict, list, str)):
+                # a bare number or literal may continue in the next chunk
+                if self.fill():
+                    continue
+            self.pos = end
+            return value
+
+    def items(self):
+        """Elements of the array that starts here"""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def _read_json(f):
+    stream = _JsonStream(f)
+    if stream.peek() == "[":
+        # [ {record}, ... ] as written by write_records
+        yield from stream.items()
+        return
+    # { "YYYY-MM-DD": [ {task}, ... ], ... } as saved by 101tegbar.py
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        date = stream.value()
+        stream.expect(":")
+        if stream.peek() == "[":
+            for task in stream.items():
+                if isinstance(task, dict):
+                    yield {**task, "date": task.get("date") or date}
+        else:
+            stream.value()  # e.g. the journal's "_seq" marker
+        if stream.expect(",}") == "}":
+            return
+
+
+def read_records(path, fmt=None, progress=None):
+    """Yield normalized records from path, skipping entries without text.
+
+    progress, if given, is called with (records read, fraction of the file
+    read) every BATCH_SIZE records and once at the end.
+    """
+    path = Path(path)
+    fmt = fmt or format_of(path)
+    total = path.stat().st_size or 1
+    counter = _CountingReader(path.open("rb"))
+    count = 0
+    with io.TextIOWrapper(io.BufferedReader(counter), encoding="utf-8-sig", newline="") as f:
+        if fmt == "csv":
+            raw_records = csv.DictReader(f)
+        elif fmt == "ndjson":
+            raw_records = (json.loads(line) for line in f if line.strip())
+        else:
+            raw_records = _read_json(f)
+        for raw in raw_records:
+            record = normalize(raw)
+            if record is None:
+                continue
+            yield record
+            count += 1
+            if progress and count % BATCH_SIZE == 0:
+                progress(count, min(counter.bytes_read / total, 1.0))
+    if progress:
+        progress(count, 1.0)
+
+
+# ---------- running off the UI thread ----------
+class Transfer:
+    """Runs an import or export on a worker and reports back to the UI thread.
+
+    work(transfer) runs on a worker and may call transfer.report(...) for
+    progress and transfer.emit(batch) to hand records to the UI thread. The
+    app supplies both threads: submit(fn) starts fn on one of its workers
+    (a falsy return means it was refused) and post(callback, *args) runs
+    callback on the UI thread, in order. The worker never calls Tk itself.
+    At most MAX_PENDING_BATCHES batches are on their way to the UI, so a fast
+    reader waits for the UI instead of piling records up in memory. Long
+    loops in work call transfer.check() to stop soon after cancel(), and
+    finished is set once work has returned or raised.
+    """
+    MAX_PENDING_BATCHES = 4
+
+    def __init__(self, submit, post, work, on_batch=None, on_progress=None, on_done=None, on_error=None):
+        self.post = post
+        self.on_batch = on_batch
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.on_error = on_error
+        self.cancelled = False
+        self.finished = threading.Event()
+        self._slots = threading.Semaphore(self.MAX_PENDING_BATCHES)
+        self._lock = threading.Lock()
+        self._progress = None  # latest report not yet shown; only the latest matters
+        if not submit(lambda: self._run(work)):
+            raise RuntimeError("Too much background work queued, try again in a moment.")
+
+    def report(self, *progress):
+        with self._lock:
+            posted = self._progress is not None
+            self._progress = progress
+        if not posted:
+            self.post(self._show_progress)
+
+    def emit(self, batch):
+        while not self.cancelled:
+            if self._slots.acquire(timeout=0.1):
+                self.post(self._deliver, batch)
+                return
+
+    def cancel(self):
+        self.cancelled = True
+
+    def check(self):
+        if self.cancelled:
+            raise Cancelled()
+
+    def _run(self, work):
+        try:
+            result = work(self)
+        except Exception as e:
+            self.post(self._finish, self.on_error, e)
+        else:
+            self.post(self._finish, self.on_done, result)
+        finally:
+            self.finished.set()
+
+    # the rest runs on the UI thread
+    def _show_progress(self):
+        with self._lock:
+            progress, self._progress = self._progress, None
+        if not self.cancelled and self.on_progress:
+            self.on_progress(*progress)
+
+    def _deliver(self, batch):
+        try:
+            if not self.cancelled and self.on_batch:
+                self.on_batch(batch)
+        finally:
+            self._slots.release()
+
+    def _finish(self, callback, value):
+        if not self.cancelled and callback:
+            callback(value)
@@ -0,0 +1,136 @@
+"""Opt-in timing of the Tegbar apps' hot paths.
+
+Set TEGBAR_PROFILE to turn it on without touching the code:
+
+    TEGBAR_PROFILE=1 python 101tegbar.py          # report on stderr at exit
+    TEGBAR_PROFILE=prof.txt python tegbar-list.py  # report written to prof.txt
+
+Functions decorated with @timed() and blocks wrapped in `with span(name):`
+are counted and their latencies collected in a histogram per name. When
+TEGBAR_PROFILE is unset, timed() hands the function back unchanged and span()
+is a shared no-op context manager, so instrumented code runs as before.
+"""
+import atexit
+import bisect
+import contextlib
+import functools
+import os
+import sys
+import threading
+import time
+
+SETTING = os.environ.get("TEGBAR_PROFILE", "").strip()
+ENABLED = SETTING.lower() not in ("", "0", "false", "no", "off")
+TO_STDERR = SETTING.lower() in ("1", "true", "yes", "on")
+
+# upper bounds of the histogram buckets, in milliseconds (the last is open)
+BUCKETS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class Histogram:
+    """Call count and latency distribution of one instrumented name"""
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0  # ms
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the given fraction of calls
+        (never more than the slowest call seen)"""
+        wanted = fraction * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= wanted:
+                return min(BUCKETS_MS[i], self.max) if i < len(BUCKETS_MS) else self.max
+        return self.max
+
+
+_stats = {}  # name -> Histogram
+_lock = threading.Lock()  # instrumented code runs on worker threads too
+
+
+def record(name, seconds):
+    if not ENABLED:
+        return
+    with _lock:
+        histogram = _stats.get(name)
+        if histogram is None:
+            histogram = _stats[name] = Histogram()
+        histogram.add(seconds * 1000)
+
+
+def timed(name=None):
+    """Decorator recording every call of the function under name
+    (default: its qualified name)."""
+    def decorate(func):
+        if not ENABLED:
+            return func
+        label = name or func.__qualname__.replace("<locals>.", "")
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+_NO_SPAN = contextlib.nullcontext()
+
+
+def span(name):
+    """Context manager recording the time spent in its block under name"""
+    return _Span(name) if ENABLED else _NO_SPAN
+
+
+def report():
+    """The collected numbers as a table, slowest total first"""
+    with _lock:
+        rows = sorted(_stats.items(), key=lambda item: item[1].total, reverse=True)
+        lines = [f"{'name':<44}{'calls':>8}{'total ms':>11}{'mean':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>9}"]
+        for name, h in rows:
+            lines.append(f"{name[:43]:<44}{h.count:>8}{h.total:>11.1f}{h.total / h.count:>9.2f}"
+                         f"{h.percentile(0.5):>8.3g}{h.percentile(0.95):>8.3g}{h.percentile(0.99):>8.3g}{h.max:>9.1f}")
+    return "\n".join(lines)
+
+
+def dump():
+    if not _stats:
+        return
+    text = f"Tegbar profile ({os.path.basename(sys.argv[0])}, percentiles are bucket bounds)\n{report()}\n"
+    if TO_STDERR:
+        sys.stderr.write(text)
+    else:
+        with open(SETTING, "a", encoding="utf-8") as f:
+            f.write(text)
+
+
+if ENABLED:
+    atexit.register(dump)
@@ -0,0 +1,28 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+
+def load_script(filename, name):
+    """Import one of the app scripts, whose file names aren't module names"""
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, ROOT / filename)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+
+@pytest.fixture(scope="session")
+def todo_app():
+    return load_script("101tegbar.py", "tegbar_todo_app")
+
+
+@pytest.fixture(scope="session")
+def tegbar_list():
+    return load_script("tegbar-list.py", "tegbar_list")
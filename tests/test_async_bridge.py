@@ -0,0 +1,189 @@
+import asyncio
+import gc
+import socket
+import sys
+import threading
+import time
+import tkinter
+
+import pytest
+
+from tegbar_async import AsyncBridge
+
+
+class FakeWidget:
+    """after() bookkeeping without Tk; a bridge on it falls back to polling"""
+    def __init__(self):
+        self.pending = {}
+        self.errors = []
+        self._next = 0
+
+    def after(self, ms, callback):
+        self._next += 1
+        self.pending[self._next] = (ms, callback)
+        return self._next
+
+    def after_cancel(self, job):
+        self.pending.pop(job, None)
+
+    def report_callback_exception(self, *exc_info):
+        self.errors.append(exc_info[1])
+
+
+@pytest.fixture
+def tcl():
+    try:
+        interp = tkinter.Tcl()
+    except tkinter.TclError as e:
+        pytest.skip(f"no Tcl: {e}")
+    errors = interp.errors = []
+    interp.report_callback_exception = lambda *exc_info: errors.append(exc_info[1])
+    yield interp
+    # Tcl aborts if an interpreter is freed on another thread, e.g. by a
+    # garbage collection a later test's worker happens to trigger
+    del interp
+    gc.collect()
+
+
+@pytest.fixture
+def bridge(tcl):
+    bridge = AsyncBridge(tcl)
+    yield bridge
+    bridge.close()
+
+
+@pytest.fixture
+def watching(bridge):
+    if bridge._watched is None:
+        pytest.skip("Tk can't watch the loop's selector here")
+    return bridge
+
+
+def run_tk(interp, seconds):
+    done = []
+    interp.after(int(seconds * 1000), lambda: done.append(True))
+    while not done:
+        interp.tk.dooneevent()
+
+
+def test_event_loop_keeps_what_next_delay_reads():
+    # _next_delay and _watch rely on these BaseEventLoop internals
+    loop = asyncio.new_event_loop()
+    try:
+        assert not loop._ready
+        loop.call_soon(lambda: None)
+        assert len(loop._ready) == 1
+        handle = loop.call_later(5, lambda: None)
+        assert loop._scheduled[0] is handle
+        assert handle.when() == pytest.approx(loop.time() + 5, abs=0.5)
+        if sys.platform != "win32":
+            assert loop._selector.fileno() >= 0
+    finally:
+        loop.close()
+
+
+def test_polling_delay_follows_what_the_loop_waits_for():
+    widget = FakeWidget()
+    bridge = AsyncBridge(widget)
+    try:
+        assert bridge._watched is None
+        bridge._pump()
+        assert bridge._next_delay() == AsyncBridge.HEARTBEAT_MS
+        bridge.loop.call_soon(lambda: None)
+        assert bridge._next_delay() == 0
+        bridge._pump()
+        bridge.loop.call_later(0.1, lambda: None)
+        assert 50 < bridge._next_delay() <= 100
+        release = threading.Event()
+        bridge.submit(release.wait)
+        assert bridge._next_delay() == AsyncBridge.JOB_MS
+        release.set()
+    finally:
+        bridge.close()
+
+
+def test_idle_loop_is_not_ticked(watching, tcl):
+    run_tk(tcl, 0.1)
+    ticks = watching.ticks
+    run_tk(tcl, 0.5)
+    assert watching.ticks == ticks
+
+
+def test_socket_data_wakes_the_loop(watching, tcl):
+    ours, theirs = socket.socketpair()
+    received = []
+
+    async def read():
+        reader, writer = await asyncio.open_connection(sock=ours)
+        received.append(await reader.readline())
+        writer.close()
+
+    watching.spawn(read())
+    run_tk(tcl, 0.1)
+    ticks = watching.ticks
+    sent = time.perf_counter()
+    theirs.sendall(b"hello\n")
+    while not received and time.perf_counter() - sent < 1:
+        tcl.tk.dooneevent()
+    assert received == [b"hello\n"]
+    assert time.perf_counter() - sent < AsyncBridge.IO_MS / 1000
+    assert watching.ticks - ticks <= 3
+    theirs.close()
+
+
+def test_posts_from_other_threads_run_in_order_on_the_tk_thread(watching, tcl):
+    seen = []
+    tk_thread = threading.get_ident()
+
+    def post_all():
+        for i in range(100):
+            watching.post(lambda i=i: seen.append((i, threading.get_ident())))
+
+    thread = threading.Thread(target=post_all)
+    thread.start()
+    thread.join()
+    run_tk(tcl, 0.1)
+    assert seen == [(i, tk_thread) for i in range(100)]
+    assert watching.stats()["posted"] == 0
+
+
+def test_submit_and_run_in_thread_deliver_results_and_errors(bridge, tcl):
+    results = []
+    bridge.submit(lambda: 6 * 7, on_done=results.append)
+    bridge.submit(lambda: 1 / 0, on_error=lambda e: results.append(type(e)))
+
+    async def awaited():
+        results.append(await bridge.run_in_thread(sum, [1, 2, 3]))
+
+    bridge.spawn(awaited())
+    run_tk(tcl, 0.3)
+    assert sorted(results, key=str) == sorted([42, ZeroDivisionError, 6], key=str)
+    assert bridge.jobs == 0
+
+
+def test_failing_task_and_callback_are_reported(bridge, tcl):
+    async def fail():
+        raise ValueError("task")
+
+    bridge.spawn(fail())
+    bridge.post(lambda: 1 / 0)
+    run_tk(tcl, 0.1)
+    assert sorted(type(e).__name__ for e in tcl.errors) == ["ValueError", "ZeroDivisionError"]
+
+
+def test_close_cancels_pending_tasks(tcl):
+    bridge = AsyncBridge(tcl)
+    cancelled = []
+
+    async def wait_forever():
+        try:
+            await asyncio.sleep(3600)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    bridge.spawn(wait_forever())
+    run_tk(tcl, 0.05)
+    bridge.close()
+    assert cancelled == [True]
+    assert bridge.loop.is_closed()
@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+
+import tegbar_chat
+from tegbar_chat import ChatServer, ChatSession, encode, read_frame
+
+
+def run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 10))
+
+
+async def until(condition):
+    while not condition():
+        await asyncio.sleep(0.005)
+
+
+async def connect(port, user, session="s1", received=0):
+    reader, writer = await asyncio.open_connection(tegbar_chat.HOST, port)
+    writer.write(encode({"type": "hello", "user": user, "session": session, "received": received}))
+    return reader, writer
+
+
+async def send(writer, *ids, to="Jonas"):
+    writer.write(encode({"type": "send", "messages": [{"id": i, "to": to, "text": f"m{i}", "time": ""}
+                                                     for i in ids]}))
+    await writer.drain()
+
+
+async def frames_until_ack(reader, upto):
+    frames = []
+    while True:
+        frame = await read_frame(reader)
+        frames.append(frame)
+        if frame == {"type": "ack", "upto": upto}:
+            return frames
+
+
+def test_resent_messages_are_handled_once():
+    async def scenario():
+        server = ChatServer(reply_delay=0, silent={"Jonas"})
+        port = await server.start()
+        reader, writer = await connect(port, "ada")
+        await send(writer, 1, 2)
+        await frames_until_ack(reader, 2)
+        writer.close()
+        # reconnect and resend everything, as a client does before it saw the ack
+        reader, writer = await connect(port, "ada")
+        await send(writer, 1, 2, 3)
+        await frames_until_ack(reader, 3)
+        writer.close()
+        await server.close()
+        return server.received
+    assert run(scenario()) == 3
+
+
+def test_a_restarted_client_is_not_taken_for_a_resend():
+    async def scenario():
+        server = ChatServer(reply_delay=0, silent={"Jonas"})
+        port = await server.start()
+        reader, writer = await connect(port, "ada", session="first run")
+        await send(writer, 1, 2)
+        await frames_until_ack(reader, 2)
+        writer.close()
+        # the app started again: a new session whose ids count from 1
+        reader, writer = await connect(port, "ada", session="second run")
+        await send(writer, 1)
+        await frames_until_ack(reader, 1)
+        writer.close()
+        await server.close()
+        return server.received
+    assert run(scenario()) == 3
+
+
+def test_unacknowledged_deliveries_are_replayed_after_received():
+    async def scenario():
+        server = ChatServer(reply_delay=0)
+        port = await server.start()
+        reader, writer = await connect(port, "ada")
+        await send(writer, 1, 2, 3)
+        frames = await frames_until_ack(reader, 3)
+        seqs = [m["seq"] for f in frames if f["type"] == "deliver" for m in f["messages"]]
+        while len(seqs) < 3:
+            frame = await read_frame(reader)
+            seqs += [m["seq"] for m in frame.get("messages", [])]
+        writer.close()  # gone before acknowledging any reply
+        reader, writer = await connect(port, "ada", received=1)
+        replayed = (await read_frame(reader))["messages"]
+        writer.close()
+        await server.close()
+        return seqs, [m["seq"] for m in replayed]
+    seqs, replayed = run(scenario())
+    assert seqs == [1, 2, 3]
+    assert replayed == [2, 3]
+
+
+def test_server_forgets_the_oldest_sessions_first():
+    box = tegbar_chat._Mailbox()
+    for i in range(box.MAX_SESSIONS + 1):
+        box.last_ids[f"s{i}"] = box.last_id(f"s{i}") + 5
+    assert "s0" not in box.last_ids
+    assert box.last_id(f"s{box.MAX_SESSIONS}") == 5
+
+
+def test_session_sends_what_was_queued_offline_and_gets_every_reply_once():
+    async def scenario():
+        server = ChatServer(reply_delay=0, silent={"Neo"})
+        port = await server.start()
+        replies, states = [], []
+        session = ChatSession("ada", port=port, on_message=replies.append, on_status=states.append)
+        session.send("Jonas", "before connecting")
+        task = asyncio.create_task(session.run())
+        await until(lambda: session.pending is not None)
+        session.send("Neo", "never answered")
+        session.send("Abraham", "hello")
+        await until(lambda: not session.unacked and len(replies) == 2)
+        server.drop_connections()
+        await until(lambda: session.reconnects == 1 and session.pending is not None)
+        session.send("Jonas", "after the reconnect")
+        await until(lambda: not session.unacked and len(replies) == 3)
+        await asyncio.sleep(0.05)  # nothing more arrives
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await server.close()
+        return replies, states, server.received
+    replies, states, received = run(scenario())
+    assert [m["from"] for m in replies] == ["Jonas", "Abraham", "Jonas"]
+    assert [m["seq"] for m in replies] == [1, 2, 3]
+    assert states[:3] == ["connected", "offline", "connected"]
+    assert received == 4
+
+
+@pytest.mark.parametrize("disconnect, restart", [(False, False), (True, False), (False, True), (True, True)])
+def test_load_test_delivers_exactly_once(disconnect, restart):
+    result = run(tegbar_chat.load_test(clients=5, contacts=3, messages=40, disconnect=disconnect, restart=restart))
+    assert result["messages"] == result["replies"] == 200
+    assert result["exactly_once"]
+    assert result["restarts"] == (5 if restart else 0)
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def store(todo_app, tmp_path, monkeypatch):
+    monkeypatch.setattr(todo_app.ChatStore, "SEGMENT_SIZE", 3)
+    return todo_app.ChatStore(tmp_path / "team")
+
+
+def message(i, sender="You"):
+    return {"sender": sender, "text": f"message {i}", "time": "09:00"}
+
+
+def reopen(todo_app, store):
+    again = todo_app.ChatStore(store.root, store.legacy_path)
+    again.open()
+    return again
+
+
+def test_new_store_is_seeded_with_the_example_contacts(store):
+    assert store.open() == ["Jonas", "Neo", "Abraham", "Jessica"]
+    assert store.load_newest("Jonas")[0]["text"] == "Hello team!"
+    assert store.load_newest("Neo") == []
+
+
+def test_legacy_file_is_split_into_segments_and_moved_aside(todo_app, tmp_path, monkeypatch):
+    monkeypatch.setattr(todo_app.ChatStore, "SEGMENT_SIZE", 3)
+    legacy = tmp_path / ".tegbar_team.json"
+    legacy.write_text(json.dumps({"Jonas": [message(i, "Jonas") for i in range(7)], "Broken": "x"}),
+                      encoding="utf-8")
+    store = todo_app.ChatStore(tmp_path / "team", legacy)
+    assert store.open() == ["Jonas", "Broken"]
+    assert store.manifest["contacts"]["Jonas"]["segments"] == 3
+    assert not legacy.exists()
+    assert legacy.with_name(".tegbar_team.json.migrated").exists()
+    # segments of 3, 3 and 1: the newest alone is too short, so one more is read
+    assert [m["text"] for m in store.load_newest("Jonas", at_least=2)] == [f"message {i}" for i in range(3, 7)]
+    assert len(store.load_older("Jonas")) == 3
+
+
+def test_appends_fill_segments_and_only_new_segments_touch_the_manifest(todo_app, store):
+    store.open()
+    manifest = store.root / store.MANIFEST
+    for i in range(3):
+        store.append("Neo", message(i))
+    assert store.write_pending() == 3
+    written = manifest.read_text(encoding="utf-8")
+
+    store.append("Neo", message(3))
+    store.write_pending()
+    assert manifest.read_text(encoding="utf-8") != written  # a second segment was started
+    entry = store.manifest["contacts"]["Neo"]
+    assert entry["segments"] == 2
+    assert len(store.read_segment("Neo", 0)) == 3
+    assert store.read_segment("Neo", 1) == [message(3)]
+
+    again = reopen(todo_app, store)
+    written = manifest.read_text(encoding="utf-8")
+    again.append("Neo", message(4))
+    again.write_pending()
+    assert manifest.read_text(encoding="utf-8") == written  # the tail had room: one appended line
+    assert again.read_segment("Neo", 1) == [message(3), message(4)]
+
+
+def test_new_contacts_get_their_own_directory(todo_app, store):
+    store.open()
+    store.append("Zed", message(0, "Zed"))
+    store.write_pending()
+    again = reopen(todo_app, store)
+    assert "Zed" in again.manifest["contacts"]
+    assert again.load_newest("Zed") == [message(0, "Zed")]
+
+
+def test_history_pages_in_newest_first(todo_app, store):
+    store.open()
+    for i in range(8):
+        store.append("Neo", message(i))
+    store.write_pending()
+    again = reopen(todo_app, store)
+    newest = again.load_newest("Neo", at_least=3)
+    assert [m["text"] for m in newest] == ["message 3", "message 4", "message 5", "message 6", "message 7"]
+    assert [m["text"] for m in again.load_older("Neo")] == ["message 0", "message 1", "message 2"]
+    assert again.load_older("Neo") == []
+
+
+def test_torn_line_at_the_end_of_a_segment_is_ignored(store):
+    store.open()
+    store.append("Neo", message(0))
+    store.write_pending()
+    entry = store.manifest["contacts"]["Neo"]
+    with store.segment_path(entry, 0).open("a", encoding="utf-8") as f:
+        f.write('{"sender": "You", "te')
+    assert store.load_newest("Neo") == [message(0)]
+
+
+def test_unknown_contact_reads_as_empty(store):
+    store.open()
+    assert store.load_newest("Nobody") == []
+    assert store.load_older("Nobody") == []
+    assert store.read_segment("Nobody", 0) == []
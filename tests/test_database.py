@@ -0,0 +1,160 @@
+import sqlite3
+
+import pytest
+
+
+@pytest.fixture
+def db(tegbar_list, tmp_path):
+    db = tegbar_list.Database(str(tmp_path / "users.db"))
+    db.migrate()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def user(db):
+    db.create_user("ada", "hash")
+    return db.find_user("ada", "hash")
+
+
+def version(db):
+    return db.query("PRAGMA user_version")[0][0]
+
+
+def names(db, kind):
+    return {row[0] for row in db.query("SELECT name FROM sqlite_master WHERE type=?", (kind,))}
+
+
+# ---------- migrations ----------
+def test_new_database_gets_every_step(tegbar_list, db):
+    assert version(db) == len(tegbar_list.MIGRATIONS)
+    assert {"users", "tasks", "tasks_fts"} <= names(db, "table")
+    assert "idx_tasks_user_status_time" in names(db, "index")
+    assert {"tasks_fts_insert", "tasks_fts_delete", "tasks_fts_update"} <= names(db, "trigger")
+
+
+def test_version_1_database_upgrades_in_place_and_indexes_old_rows(tegbar_list, tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    tegbar_list._migration_1_base_tables(conn)
+    conn.execute("INSERT INTO users (username, password) VALUES ('ada', 'hash')")
+    conn.execute("INSERT INTO tasks (user_id, task_text, timestamp) VALUES (1, 'water plants', '2024-01-01 08:00:00')")
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    db = tegbar_list.Database(path)
+    db.migrate()
+    assert version(db) == len(tegbar_list.MIGRATIONS)
+    assert [row[1] for row in db.search_tasks(1, "ongoing", "wat")] == ["water plants"]
+    db.close()
+
+
+def test_failing_step_is_rolled_back(tegbar_list, tmp_path, monkeypatch):
+    def broken(conn):
+        conn.execute("CREATE TABLE half_done (x)")
+        raise RuntimeError("step failed")
+
+    monkeypatch.setattr(tegbar_list, "MIGRATIONS", tegbar_list.MIGRATIONS[:1] + [broken])
+    db = tegbar_list.Database(str(tmp_path / "users.db"))
+    with pytest.raises(RuntimeError):
+        db.migrate()
+    assert version(db) == 1
+    assert "half_done" not in names(db, "table")
+    db.close()
+
+
+def test_step_that_cannot_run_leaves_the_version_below_it(tegbar_list, tmp_path, monkeypatch):
+    monkeypatch.setattr(tegbar_list, "MIGRATIONS", tegbar_list.MIGRATIONS[:2] + [lambda conn: False])
+    db = tegbar_list.Database(str(tmp_path / "users.db"))
+    db.migrate()
+    assert version(db) == 2
+    db.close()
+
+
+def test_fts_step_stays_inside_the_migration_transaction(tegbar_list):
+    conn = sqlite3.connect(":memory:")
+    tegbar_list._migration_1_base_tables(conn)
+    conn.commit()
+    conn.execute("BEGIN")
+    tegbar_list._migration_3_task_search(conn)
+    assert conn.in_transaction
+    conn.rollback()
+    assert conn.execute("SELECT name FROM sqlite_master WHERE name LIKE 'tasks_fts%'").fetchall() == []
+    conn.close()
+
+
+# ---------- keyset paging ----------
+def test_pages_follow_each_other_without_gaps_or_repeats(db, user):
+    # equal timestamps on purpose: the id breaks the tie
+    rows = [(f"task {i}", f"2024-01-0{1 + i % 3} 10:00:00") for i in range(25)]
+    ids = db.bulk_insert(user, rows)
+    expected = sorted(((timestamp, task_id) for task_id, (_, timestamp) in zip(ids, rows)), reverse=True)
+    seen, after = [], None
+    while True:
+        page = db.list_tasks(user, "ongoing", 10, after)
+        seen += [(timestamp, task_id) for task_id, _, timestamp in page]
+        if len(page) < 10:
+            break
+        after = (page[-1][2], page[-1][0])
+    assert seen == expected
+    assert [(t, i) for i, _, t in db.iter_tasks(user, "ongoing", page_size=7)] == expected
+
+
+def test_listing_uses_the_covering_index(db, user):
+    plan = db.query("EXPLAIN QUERY PLAN SELECT id, task_text, timestamp FROM tasks "
+                    "WHERE user_id=? AND status=? ORDER BY timestamp DESC, id DESC LIMIT 50", (user, "ongoing"))
+    assert any("COVERING INDEX idx_tasks_user_status_time" in row[-1] for row in plan)
+
+
+# ---------- batch operations ----------
+def test_bulk_insert_returns_the_new_ids_in_order(db, user):
+    db.add_task(user, "first", "2024-01-01 00:00:00")
+    ids = db.bulk_insert(user, [("a", "2024-01-02 00:00:00"), ("b", "2024-01-03 00:00:00")], "achieved")
+    rows = dict((task_id, text) for task_id, text, _ in db.list_tasks(user, "achieved"))
+    assert [rows[task_id] for task_id in ids] == ["a", "b"]
+    assert db.bulk_insert(user, []) == []
+
+
+def test_batch_moves_and_deletes_touch_only_the_users_tasks(db, user):
+    db.create_user("bob", "hash")
+    bob = db.find_user("bob", "hash")
+    mine = db.bulk_insert(user, [("a", "2024-01-01 00:00:00"), ("b", "2024-01-01 00:00:01")])
+    theirs = db.bulk_insert(bob, [("c", "2024-01-01 00:00:00")])
+
+    db.complete_many(user, mine + theirs)
+    assert [row[1] for row in db.list_tasks(user, "achieved")] == ["b", "a"]
+    assert [row[1] for row in db.list_tasks(bob, "ongoing")] == ["c"]
+
+    db.delete_many(user, mine[:1] + theirs)
+    assert [row[1] for row in db.list_tasks(user, "achieved")] == ["b"]
+    assert [row[1] for row in db.list_tasks(bob, "ongoing")] == ["c"]
+
+
+def test_failed_batch_writes_nothing(db, user):
+    with pytest.raises(sqlite3.Error):
+        db.bulk_insert(user, [("a", "2024-01-01 00:00:00"), (None, "2024-01-01 00:00:00")])
+    assert db.list_tasks(user, "ongoing") == []
+
+
+# ---------- search ----------
+def test_search_matches_word_prefixes_and_follows_edits(db, user):
+    first = db.add_task(user, "Buy oat milk", "2024-01-01 00:00:00")
+    db.add_task(user, "Call the plumber", "2024-01-02 00:00:00")
+    assert [row[0] for row in db.search_tasks(user, "ongoing", "buy mi")] == [first]
+    assert db.search_tasks(user, "ongoing", "ilk") == []  # words are matched from their start
+    db.set_status(user, first, "achieved")
+    assert db.search_tasks(user, "ongoing", "milk") == []
+    db.delete_task(user, first)
+    assert db.search_tasks(user, "achieved", "milk") == []
+
+
+def test_search_without_fts_falls_back_to_like(db, user):
+    db.add_task(user, "Buy oat milk", "2024-01-01 00:00:00")
+    db._has_fts = False
+    assert [row[1] for row in db.search_tasks(user, "ongoing", "ilk")] == ["Buy oat milk"]
+
+
+def test_fts_query_quotes_every_word(tegbar_list):
+    assert tegbar_list.Database.fts_query('buy "mi') == '"buy"* "mi"*'
+    assert tegbar_list.Database.fts_query("!!") == ""
@@ -0,0 +1,184 @@
+import json
+import threading
+
+import pytest
+
+
+@pytest.fixture
+def journal(todo_app, tmp_path):
+    journal = todo_app.TaskJournal(tmp_path / "tasks.json", tmp_path / "tasks.log")
+    yield journal
+    journal.close()
+
+
+def reopen(todo_app, journal):
+    journal.close()
+    return todo_app.TaskJournal(journal.snapshot_path, journal.log_path)
+
+
+def task(text, task_id=None):
+    return {"id": task_id or text, "text": text, "done": False}
+
+
+# ---------- TaskJournal ----------
+def test_logged_records_replay_on_the_next_load(todo_app, journal):
+    journal.append("add", "2024-01-01", task=task("a"))
+    journal.append("add", "2024-01-01", task=task("b"))
+    journal.append("update", "2024-01-01", id="a", fields={"done": True})
+    journal.append("delete", "2024-01-01", id="b")
+    assert journal.write_pending() == 4
+
+    again = reopen(todo_app, journal)
+    assert again.load() == {"2024-01-01": [{"id": "a", "text": "a", "done": True}]}
+    assert (again.seq, again.pending, again.skipped) == (4, 4, 0)
+    again.close()
+
+
+def test_compact_folds_the_log_into_the_snapshot(todo_app, journal):
+    journal.append("add", "2024-01-01", task=task("a"))
+    journal.write_pending()
+    journal.compact()
+    assert journal.log_path.read_text(encoding="utf-8") == ""
+    assert json.loads(journal.snapshot_path.read_text(encoding="utf-8"))["_seq"] == 1
+
+    journal.append("add", "2024-01-02", task=task("b"))
+    journal.write_pending()
+    again = reopen(todo_app, journal)
+    assert again.load() == {"2024-01-01": [task("a")], "2024-01-02": [task("b")]}
+    assert again.seq == 2
+    again.close()
+
+
+def test_records_already_in_the_snapshot_are_not_replayed_twice(todo_app, journal):
+    journal.append("add", "2024-01-01", task=task("a"))
+    journal.write_pending()
+    log = journal.log_path.read_text(encoding="utf-8")
+    journal.compact()
+    # crash after the snapshot was replaced but before the log was truncated
+    journal.log_path.write_text(log, encoding="utf-8")
+    again = reopen(todo_app, journal)
+    assert again.load() == {"2024-01-01": [task("a")]}
+    assert again.pending == 0
+    again.close()
+
+
+def test_compact_from_memory_writes_task_records(todo_app, journal):
+    tasks = {"2024-01-01": [todo_app.Task("a", "Write tests", priority="High", created="2024-01-01T09:00:00")]}
+    journal.compact(tasks)
+    data = json.loads(journal.snapshot_path.read_text(encoding="utf-8"))
+    assert data["2024-01-01"][0]["priority"] == "High"
+    assert data["2024-01-01"][0]["created"] == "2024-01-01T09:00:00"
+
+
+def test_torn_last_line_is_ignored(todo_app, journal):
+    journal.append("add", "2024-01-01", task=task("a"))
+    journal.write_pending()
+    with journal.log_path.open("a", encoding="utf-8") as f:
+        f.write('{"seq": 2, "op": "add", "da')
+    again = reopen(todo_app, journal)
+    assert again.load() == {"2024-01-01": [task("a")]}
+    again.close()
+
+
+def test_records_for_missing_tasks_are_skipped_and_counted(todo_app, journal):
+    journal.append("update", "2024-01-01", id="gone", fields={"done": True})
+    journal.append("delete", "2024-01-09", id="gone")
+    journal.append("add", "2024-01-01", task=task("a"))
+    journal.write_pending()
+    again = reopen(todo_app, journal)
+    assert again.load() == {"2024-01-01": [task("a")]}
+    assert again.skipped == 2
+    again.close()
+
+
+def test_index_records_from_before_task_ids_still_apply(todo_app, journal):
+    journal.compact({"2024-01-01": [{"text": "a"}, {"text": "b"}]})
+    journal.append("delete", "2024-01-01", index=0)
+    journal.append("update", "2024-01-01", index=5, fields={"done": True})
+    journal.write_pending()
+    again = reopen(todo_app, journal)
+    assert again.load() == {"2024-01-01": [{"text": "b"}]}
+    assert again.skipped == 1
+    again.close()
+
+
+def test_edits_after_a_failed_load_survive_the_snapshot_reading_again(todo_app, journal):
+    journal.append("add", "2024-01-01", task=task("a"))
+    journal.write_pending()
+    journal.compact()
+    snapshot = journal.snapshot_path.read_text(encoding="utf-8")
+    journal.snapshot_path.write_text("{not json", encoding="utf-8")
+
+    broken = reopen(todo_app, journal)
+    with pytest.raises(ValueError):
+        broken.load()
+    broken.renumber_after_failed_load()
+    broken.append("add", "2024-01-02", task=task("b"))
+    broken.write_pending()
+
+    journal.snapshot_path.write_text(snapshot, encoding="utf-8")
+    again = reopen(todo_app, broken)
+    assert again.load() == {"2024-01-01": [task("a")], "2024-01-02": [task("b")]}
+    again.close()
+
+
+# ---------- SaveScheduler ----------
+def test_save_requests_for_one_name_coalesce(todo_app):
+    runs = []
+    saver = todo_app.SaveScheduler(delay=0.05)
+    for i in range(5):
+        saver.schedule("tasks", lambda i=i: runs.append(i))
+    saver.flush()
+    assert runs == [4]
+    assert saver.stats()["requested"] == 5
+    assert saver.stats()["performed"] == 1
+    saver.close()
+
+
+def test_save_errors_go_to_on_error_and_the_worker_keeps_going(todo_app):
+    errors, runs = [], []
+    saver = todo_app.SaveScheduler(delay=0.01, on_error=lambda name, e: errors.append((name, type(e))))
+    saver.schedule("tasks", lambda: 1 / 0)
+    saver.flush()
+    saver.schedule("team", lambda: runs.append(threading.current_thread().name))
+    saver.close()
+    assert errors == [("tasks", ZeroDivisionError)]
+    assert len(runs) == 1 and runs[0] != threading.current_thread().name
+
+
+# ---------- TaskSearchIndex ----------
+@pytest.fixture
+def index(todo_app):
+    index = todo_app.TaskSearchIndex()
+    Task = todo_app.Task
+    index.add_many([
+        Task("old", "Buy milk", created="2024-01-01T00:00:00"),
+        Task("new", "Buy milkshake", created="2024-02-01T00:00:00"),
+        Task("notes", "Groceries", notes="milk and bread", created="2024-03-01T00:00:00"),
+        Task("other", "Call mom", created="2024-03-01T00:00:00"),
+    ])
+    return index
+
+
+def test_search_ranks_by_where_words_match_then_recency(index):
+    # whole word in the title (4) > prefix in the title (2) = whole word in the notes (2)
+    assert index.search("milk") == ["old", "notes", "new"]
+    assert index.search("mil", limit=2) == ["new", "old"]
+
+
+def test_search_needs_every_word(index):
+    assert index.search("buy shake") == []
+    assert index.search("buy milks") == ["new"]
+    assert index.search("  ") == []
+
+
+def test_search_follows_updates_and_removals(todo_app, index):
+    index.remove("old")
+    index.update(todo_app.Task("other", "Call mom about milk", created="2024-03-01T00:00:00"))
+    assert index.search("milk") == ["other", "notes", "new"]
+    index.remove("notes")
+    assert "bread" not in index.words
+
+
+def test_cancelled_search_returns_none(index):
+    assert index.search("milk", cancelled=lambda: True) is None
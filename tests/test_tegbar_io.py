@@ -0,0 +1,137 @@
+import json
+import threading
+
+import pytest
+
+import tegbar_io
+
+RECORDS = [
+    {"id": "1", "date": "2024-01-01", "text": "Plain", "time": "09:00", "priority": "High",
+     "done": False, "notes": "", "created": "2024-01-01T08:00:00"},
+    {"id": "2", "date": "2024-01-02", "text": 'Quotes "and", commas\nand a newline', "time": "",
+     "priority": "Low", "done": True, "notes": "ünïcode ✓", "created": "2024-01-02T08:00:00"},
+]
+
+
+@pytest.mark.parametrize("fmt", tegbar_io.FORMATS)
+def test_records_survive_a_round_trip(tmp_path, fmt):
+    path = tmp_path / f"tasks.{fmt}"
+    assert tegbar_io.write_records(path, iter(RECORDS)) == 2
+    assert list(tegbar_io.read_records(path)) == RECORDS
+    assert not (tmp_path / f"tasks.{fmt}.part").exists()
+
+
+@pytest.mark.parametrize("fmt", tegbar_io.FORMATS)
+def test_large_files_stream_in_batches(tmp_path, fmt):
+    path = tmp_path / f"many.{fmt}"
+    count = tegbar_io.BATCH_SIZE * 3 + 7
+    written = []
+    tegbar_io.write_records(path, ({**RECORDS[0], "id": str(i)} for i in range(count)), progress=written.append)
+    assert written[-1] == count
+    progress = []
+    ids = [r["id"] for r in tegbar_io.read_records(path, progress=lambda n, fraction: progress.append((n, fraction)))]
+    assert ids == [str(i) for i in range(count)]
+    assert progress[-1] == (count, 1.0)
+    assert [len(b) for b in tegbar_io.batched(range(count))] == [tegbar_io.BATCH_SIZE] * 3 + [7]
+
+
+def test_reads_the_101tegbar_store_layout(tmp_path):
+    path = tmp_path / "tasks.json"
+    path.write_text(json.dumps({
+        "2024-01-01": [{"id": "a", "text": "From the app", "done": True}],
+        "_seq": 12,
+        "2024-01-02": [{"text": ""}, "not a task"],
+    }), encoding="utf-8")
+    records = list(tegbar_io.read_records(path))
+    assert [(r["id"], r["date"], r["done"]) for r in records] == [("a", "2024-01-01", True)]
+
+
+def test_normalize_accepts_loose_input():
+    record = tegbar_io.normalize({"task_text": " Water plants ", "timestamp": "2024-03-04 05:06:07",
+                                  "status": "achieved", "priority": "urgent"})
+    assert record["text"] == "Water plants"
+    assert record["date"] == "2024-03-04"
+    assert record["done"] is True
+    assert record["priority"] == "Normal"
+    assert tegbar_io.normalize({"done": "yes", "text": "x"})["done"] is True
+    assert tegbar_io.normalize({"text": "  "}) is None
+
+
+def test_format_comes_from_the_extension():
+    assert tegbar_io.format_of("a.JSONL") == "ndjson"
+    assert tegbar_io.format_of("a.csv") == "csv"
+    with pytest.raises(ValueError):
+        tegbar_io.format_of("a.txt")
+
+
+def test_failed_export_leaves_no_file_behind(tmp_path):
+    def records():
+        yield RECORDS[0]
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        tegbar_io.write_records(tmp_path / "out.json", records())
+    assert list(tmp_path.iterdir()) == []
+
+
+# ---------- Transfer ----------
+class Inline:
+    """submit on a plain thread, post into a list the test drains"""
+    def __init__(self):
+        self.posted = []
+        self.threads = []
+
+    def submit(self, fn):
+        thread = threading.Thread(target=fn)
+        self.threads.append(thread)
+        thread.start()
+        return True
+
+    def post(self, callback, *args):
+        self.posted.append((callback, args))
+
+    def drain(self):
+        while self.posted:
+            callback, args = self.posted.pop(0)
+            callback(*args)
+
+
+def test_transfer_delivers_batches_then_the_result():
+    ui, batches, done = Inline(), [], []
+
+    def work(t):
+        for batch in tegbar_io.batched(range(10), 3):
+            t.emit(batch)
+        return "ok"
+
+    transfer = tegbar_io.Transfer(ui.submit, ui.post, work, on_batch=batches.append, on_done=done.append)
+    assert transfer.finished.wait(2)
+    ui.drain()
+    assert batches == [[0, 1, 2], [3, 4, 5], [6, 7, 8], [9]]
+    assert done == ["ok"]
+
+
+def test_cancelled_export_stops_and_removes_its_partial_file(tmp_path):
+    ui, outcome = Inline(), []
+    started = threading.Event()
+
+    def records(t):
+        for i in range(10 ** 7):
+            started.set()
+            t.check()
+            yield RECORDS[0]
+
+    transfer = tegbar_io.Transfer(ui.submit, ui.post,
+                                  lambda t: tegbar_io.write_records(tmp_path / "out.csv", records(t)),
+                                  on_done=outcome.append, on_error=outcome.append)
+    assert started.wait(2)
+    transfer.cancel()
+    assert transfer.finished.wait(2)
+    ui.drain()
+    assert outcome == []  # a cancelled transfer reports nothing
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_refused_transfer_raises():
+    with pytest.raises(RuntimeError):
+        tegbar_io.Transfer(lambda fn: False, None, lambda t: None)